@@ -0,0 +1,120 @@
+# async_db.py
+"""Асинхронный доступ к Database: вызовы выполняются в пуле рабочих потоков.
+
+Запросы с одинаковым ключом (key) вытесняют друг друга: новый запрос отменяет
+предыдущий. Если тот еще ждет в очереди, он не запустится, а если уже
+выполняется, его SQL прерывается через Connection.interrupt().
+"""
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class Request:
+    """Запрос к базе в пуле потоков"""
+
+    def __init__(self, key):
+        self.key = key
+        self.future = None
+        self.conn = None
+        self.cancelled = False
+
+
+class DatabaseExecutor:
+    """Пул потоков для вызовов Database с отменой устаревших запросов"""
+
+    def __init__(self, db, max_workers=4):
+        self.db = db
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+        self._lock = threading.Lock()
+        # Последний запрос по каждому ключу; остается и после завершения,
+        # чтобы еще не доставленный результат можно было отбросить
+        self._latest = {}
+
+    def submit(self, func, *args, key=None, **kwargs):
+        """Поставить вызов func(*args, **kwargs) в очередь; вернуть Request"""
+        request = Request(key)
+        request.future = self._pool.submit(self._run, request, func, args, kwargs)
+        if key is not None:
+            with self._lock:
+                previous = self._latest.get(key)
+                self._latest[key] = request
+            if previous is not None:
+                self.cancel(previous)
+        return request
+
+    def _run(self, request, func, args, kwargs):
+        """Выполнить вызов в рабочем потоке, запомнив его соединение для прерывания"""
+        with self._lock:
+            if request.cancelled:
+                raise CancelledError()
+            # Database работает через соединение текущего потока (см. storage/db_pool.py)
+            request.conn = self.db.get_connection()
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if request.cancelled:
+                raise CancelledError() from e
+            raise
+        finally:
+            with self._lock:
+                request.conn = None
+
+    def cancel(self, request):
+        """Отменить запрос: снять из очереди или прервать выполняющийся SQL"""
+        with self._lock:
+            request.cancelled = True
+            request.future.cancel()
+            if request.conn is not None:
+                request.conn.interrupt()
+
+    def shutdown(self):
+        """Отменить ожидающие запросы, прервать выполняющиеся и дождаться остановки пула"""
+        with self._lock:
+            pending = list(self._latest.values())
+        for request in pending:
+            self.cancel(request)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class AsyncDatabase:
+    """Корутины поверх Database: await adb.find_matches(user_id, limit=15, key='matches').
+
+    Любой публичный метод Database доступен как корутина; необязательный
+    аргумент key включает вытеснение предыдущего запроса с тем же ключом
+    (вытесненный вызов завершается asyncio.CancelledError).
+    """
+
+    def __init__(self, db, max_workers=4):
+        self.db = db
+        self.executor = DatabaseExecutor(db, max_workers)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        method = getattr(self.db, name)
+        if not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args, key=None, **kwargs):
+            return await self.run(method, *args, key=key, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+    async def run(self, func, *args, key=None, **kwargs):
+        """Выполнить произвольную функцию в пуле потоков базы"""
+        request = self.executor.submit(func, *args, key=key, **kwargs)
+        try:
+            return await asyncio.wrap_future(request.future)
+        except asyncio.CancelledError:
+            self.executor.cancel(request)
+            raise
+        except CancelledError as e:
+            raise asyncio.CancelledError() from e
+
+    def close(self):
+        """Остановить пул потоков"""
+        self.executor.shutdown()
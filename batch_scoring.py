@@ -0,0 +1,122 @@
+# batch_scoring.py
+"""Пакетный расчет совпадений "все со всеми" на разреженных матрицах.
+
+Баллы считаются по той же формуле, что и Database.find_matches:
+общие навыки * 10 + общие интересы * 5 (+20, если оба ищут проект).
+Требует numpy и scipy, которые не нужны остальному приложению.
+"""
+from storage.matching import SKILL_WEIGHT, INTEREST_WEIGHT, PROJECT_BONUS
+
+# Множитель для упаковки двух счетчиков в одно число:
+# значение = общие_навыки * PACK + общие_интересы
+PACK = 1 << 20
+
+
+def _import_numeric():
+    """Импортировать numpy/scipy с понятной ошибкой при их отсутствии"""
+    try:
+        import numpy as np
+        from scipy import sparse
+    except ImportError as e:
+        raise ImportError("Для пакетного расчета нужны numpy и scipy: pip install numpy scipy") from e
+    return np, sparse
+
+
+def load_incidence(conn):
+    """Построить матрицы инцидентности пользователь×навык и пользователь×интерес.
+
+    Возвращает (user_ids, skills, interests, looking): отсортированный массив id
+    пользователей, две CSR-матрицы из 0/1 и булев массив "ищет проект".
+    """
+    np, sparse = _import_numeric()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT id, looking_for_project FROM users ORDER BY id")
+    rows = cursor.fetchall()
+    user_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    looking = np.array([bool(row[1]) for row in rows], dtype=bool)
+
+    cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM skill")
+    n_terms = cursor.fetchone()[0]
+
+    def incidence(table):
+        cursor.execute(f"SELECT user_id, skill_id FROM {table}")
+        pairs = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+        # Связи пользователей, которых уже нет в users, пропускаем
+        rows_idx = np.searchsorted(user_ids, pairs[:, 0])
+        rows_idx = np.minimum(rows_idx, max(len(user_ids) - 1, 0))
+        known = (user_ids[rows_idx] == pairs[:, 0]) if len(user_ids) else np.zeros(len(pairs), dtype=bool)
+        data = np.ones(int(known.sum()), dtype=np.int64)
+        return sparse.csr_matrix((data, (rows_idx[known], pairs[known, 1])),
+                                 shape=(len(user_ids), n_terms))
+
+    return user_ids, incidence('user_skill'), incidence('user_interest'), looking
+
+
+def score_all_pairs(conn, top_k=15, block_size=2048):
+    """Посчитать top_k совпадений для каждого пользователя.
+
+    Генератор пар (user_id, [(other_id, score, common_skills, common_interests), ...]),
+    где common_* — количество общих навыков/интересов. Порядок совпадений тот же,
+    что у find_matches: по убыванию балла, при равенстве — по возрастанию id.
+    Память ограничена блоком из block_size строк матрицы произведения.
+    """
+    np, _ = _import_numeric()
+    user_ids, skills, interests, looking = load_incidence(conn)
+    skills_t = skills.T.tocsr()
+    interests_t = interests.T.tocsr()
+
+    for start in range(0, len(user_ids), block_size):
+        stop = min(start + block_size, len(user_ids))
+
+        # Общие навыки и интересы для блока строк одним разреженным произведением
+        packed = (skills[start:stop] @ skills_t) * PACK + interests[start:stop] @ interests_t
+        packed = packed.tocoo()
+
+        rows = packed.row
+        cols = packed.col
+        values = packed.data
+        keep = (rows + start) != cols
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+
+        common_skills = values // PACK
+        common_interests = values % PACK
+        scores = common_skills * SKILL_WEIGHT + common_interests * INTEREST_WEIGHT
+        scores = scores + PROJECT_BONUS * (looking[rows + start] & looking[cols])
+
+        # Сортировка: строка, затем балл по убыванию, затем id по возрастанию
+        other_ids = user_ids[cols]
+        order = np.lexsort((other_ids, -scores, rows))
+        rows = rows[order]
+        counts = np.bincount(rows, minlength=stop - start)
+        row_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        if top_k is not None:
+            rank = np.arange(len(rows)) - row_starts[rows]
+            order, rows = order[rank < top_k], rows[rank < top_k]
+
+        result = {}
+        for i, other_id, score, n_skills, n_interests in zip(
+                rows, other_ids[order], scores[order], common_skills[order], common_interests[order]):
+            result.setdefault(int(i), []).append((int(other_id), int(score), int(n_skills), int(n_interests)))
+
+        for i in range(stop - start):
+            yield int(user_ids[start + i]), result.get(i, [])
+
+
+def verify_against_find_matches(db, top_k=15, user_ids=None):
+    """Сверить пакетный расчет с Database.find_matches.
+
+    Возвращает список id пользователей, для которых результаты расходятся.
+    """
+    wanted = set(user_ids) if user_ids is not None else None
+    mismatches = []
+    for user_id, batch in score_all_pairs(db.get_connection(), top_k=top_k):
+        if wanted is not None and user_id not in wanted:
+            continue
+        expected = [
+            (m['user']['id'], m['score'], len(m['common_skills']), len(m['common_interests']))
+            for m in db.find_matches(user_id, limit=top_k)
+        ]
+        if batch != expected:
+            mismatches.append(user_id)
+    return mismatches
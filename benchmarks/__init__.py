@@ -0,0 +1,10 @@
+# benchmarks/__init__.py
+"""Замеры производительности на синтетических данных.
+
+Запуск:
+    python -m benchmarks --users 1000 10000 --output results.json
+    python -m benchmarks --users 1000 --baseline results.json
+
+Результаты пишутся в JSON; при указании --baseline медианы сравниваются
+с сохраненным прогоном, и замедление сверх порога дает код возврата 1.
+"""
@@ -0,0 +1,234 @@
+# benchmarks/__main__.py
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import DataGenerator, populate_collabmatch, populate_student_collab, summarize, timed
+from benchmarks.imports import bench_imports
+
+# Чтения, которые замеряются и напрямую, и через CachedDatabase (ключ cached_<имя>)
+CACHED_READS = ('get_all_users', 'get_stats', 'find_matches')
+
+# Медиана одиночного add_user на заполненной базе любого размера, мс: пересчет
+# match_scores зависит от терминов нового пользователя, а не от числа пользователей
+ADD_USER_BUDGET_MS = 1000
+
+
+def measure(func, args_list, repeat):
+    """Вызвать func для каждого набора аргументов repeat раз (после прогрева)"""
+    for args in args_list:
+        func(*args)
+    samples = []
+    for _ in range(repeat):
+        for args in args_list:
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_collabmatch(workdir, size, seed, repeat, sample):
+    """Замеры database.Database"""
+    from storage import CachedDatabase, Database
+
+    generator = DataGenerator(seed)
+    db = Database(os.path.join(workdir, 'collabmatch.db'))
+    results = {}
+    inserted = {'add_users_bulk': size, 'add_events_bulk': size // 10, 'add_projects_bulk': size // 10}
+    timings = populate_collabmatch(db, generator, size, size // 10, size // 10)
+    for name, seconds in timings.items():
+        results[name] = {'seconds': round(seconds, 4), 'rows_per_second': round(inserted[name] / seconds, 1)}
+
+    rng = random.Random(seed)
+    user_ids = [(rng.randint(1, size),) for _ in range(sample)]
+    queries = [(term,) for term in generator.skills.terms[:sample // 2] + generator.interests.terms[:sample // 2]]
+
+    results['find_matches'] = measure(lambda uid: db.find_matches(uid, limit=15), user_ids, repeat)
+    results['count_matches'] = measure(db.count_matches, user_ids, repeat)
+    results['search'] = measure(db.search, queries, repeat)
+    results['search_substring'] = measure(db.search_substring, queries, repeat)
+    results['get_stats'] = measure(db.get_stats, [()], repeat * sample)
+    results['get_all_projects'] = measure(db.get_all_projects, [()], repeat)
+    results['get_all_users'] = measure(db.get_all_users, [()], repeat)
+
+    # Одиночные записи на заполненной базе; каждый add_user — новый пользователь
+    results['add_user'] = summarize([timed(db.add_user, *user)[1] for user in generator.users(sample)])
+    results['update_user'] = summarize([
+        timed(db.update_user, uid, None, None,
+              generator.terms(generator.skills), generator.terms(generator.interests))[1]
+        for (uid,) in user_ids])
+    db.close()
+
+    # Те же чтения через кэш: после прогрева каждый вызов — попадание
+    cached = CachedDatabase(os.path.join(workdir, 'collabmatch.db'))
+    results['cached_get_all_users'] = measure(cached.get_all_users, [()], repeat)
+    results['cached_get_stats'] = measure(cached.get_stats, [()], repeat * sample)
+    results['cached_find_matches'] = measure(lambda uid: cached.find_matches(uid, limit=15), user_ids, repeat)
+    cached.close()
+    return results
+
+
+def slow_cache_reads(results):
+    """Ключи cached_<имя>, медиана которых не меньше медианы прямого чтения"""
+    slow = []
+    for key, value in results.items():
+        prefix, _, name = key.rpartition('/cached_')
+        direct = results.get(f"{prefix}/{name}") if name in CACHED_READS else None
+        if direct and value['median_ms'] >= direct['median_ms']:
+            slow.append(key)
+    return slow
+
+
+def slow_single_writes(results):
+    """Ключи add_user, медиана которых больше ADD_USER_BUDGET_MS"""
+    return [key for key, value in results.items()
+            if key.endswith('/collabmatch/add_user') and value['median_ms'] > ADD_USER_BUDGET_MS]
+
+
+def bench_student_collab(workdir, size, seed, repeat, sample):
+    """Замеры registration.EnhancedDatabase"""
+    from storage import EnhancedDatabase
+
+    generator = DataGenerator(seed)
+    edb = EnhancedDatabase(os.path.join(workdir, 'student_collab.db'))
+    projects = max(size // 10, 1)
+    messages = size * 5
+    results = {}
+    inserted = {'insert_users': size, 'insert_projects': projects, 'insert_messages': messages}
+    timings = populate_student_collab(edb, generator, size, projects, messages)
+    for name, seconds in timings.items():
+        results[name] = {'seconds': round(seconds, 4), 'rows_per_second': round(inserted[name] / seconds, 1)}
+
+    rng = random.Random(seed)
+    project_ids = [(rng.randint(1, projects),) for _ in range(sample)]
+    skills = generator.skills.terms[:sample]
+
+    results['get_all_projects'] = measure(edb.get_all_projects, [()], repeat)
+    results['get_all_projects_search'] = measure(
+        lambda q: edb.get_all_projects(search_query=q), [(s,) for s in skills], repeat)
+    results['get_all_projects_skills'] = measure(
+        lambda q: edb.get_all_projects(skills_filter=q), [(s,) for s in skills], repeat)
+    results['get_project_messages'] = measure(edb.get_project_messages, project_ids, repeat)
+    results['get_project_messages_older'] = measure(
+        lambda pid: edb.get_project_messages(pid, before_id=messages // 2), project_ids, repeat)
+    edb.close()
+    return results
+
+
+def compare(results, baseline, threshold, noise_ms=0.0):
+    """Сравнить медианы с базовым прогоном: {имя: отношение}, список замедлений.
+
+    Замедлением считается отношение больше threshold, если при этом разница
+    больше noise_ms — так доли миллисекунды не дают ложных срабатываний.
+    """
+    ratios = {}
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous:
+            continue
+        metric = 'median_ms' if 'median_ms' in current else 'seconds'
+        if metric not in current or not previous.get(metric):
+            continue
+        ratio = round(current[metric] / previous[metric], 3)
+        ratios[key] = ratio
+        scale = 1 if metric == 'median_ms' else 1000
+        if ratio > threshold and (current[metric] - previous[metric]) * scale > noise_ms:
+            regressions.append(key)
+    return ratios, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Замеры производительности")
+    parser.add_argument('--users', type=int, nargs='+', default=[1000],
+                        help="размеры наборов (число пользователей), например 1000 10000 100000")
+    parser.add_argument('--seed', type=int, default=42, help="seed генератора данных")
+    parser.add_argument('--repeat', type=int, default=5, help="повторов каждого замера")
+    parser.add_argument('--sample', type=int, default=20, help="число разных аргументов в замере")
+    parser.add_argument('--only', choices=['collabmatch', 'student_collab', 'imports'],
+                        help="только одна база или только время импорта")
+    parser.add_argument('--output', help="файл для JSON-результатов (по умолчанию stdout)")
+    parser.add_argument('--baseline', help="JSON прошлого прогона для сравнения")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="допустимое отношение медиан к базовому прогону")
+    parser.add_argument('--noise-ms', type=float, default=0.5,
+                        help="разница в мс, меньше которой замедление не учитывается")
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'sample': args.sample,
+            'users': args.users,
+            'add_user_budget_ms': ADD_USER_BUDGET_MS,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'results': {},
+        'failed': {},
+    }
+
+    status = 0
+    if not args.only or args.only == 'imports':
+        print("время импорта...", file=sys.stderr)
+        for key, value in bench_imports(args.repeat).items():
+            report['results'][f"imports/{key}"] = value
+            if value.get('gui_modules'):
+                print(f"Импорт {key} загружает GUI: {', '.join(value['gui_modules'])}", file=sys.stderr)
+                status = 1
+
+    suites = {'collabmatch': bench_collabmatch, 'student_collab': bench_student_collab}
+    for size in args.users if args.only != 'imports' else []:
+        for name, suite in suites.items():
+            if args.only and name != args.only:
+                continue
+            print(f"{name}: {size} пользователей...", file=sys.stderr)
+            try:
+                with tempfile.TemporaryDirectory() as workdir:
+                    results = suite(workdir, size, args.seed, args.repeat, args.sample)
+            except (MemoryError, OSError, sqlite3.Error) as e:
+                # Размер, который не удалось замерить, — ошибка прогона, а не пропуск
+                report['failed'][f"{size}/{name}"] = f"{type(e).__name__}: {e}"
+                print(f"{name}: {size} пользователей не замерено — {type(e).__name__}: {e}", file=sys.stderr)
+                status = 1
+                continue
+            for key, value in results.items():
+                report['results'][f"{size}/{name}/{key}"] = value
+
+    for key in slow_cache_reads(report['results']):
+        print(f"Кэш не быстрее прямого чтения: {key}", file=sys.stderr)
+        status = 1
+    for key in slow_single_writes(report['results']):
+        print(f"add_user дольше {ADD_USER_BUDGET_MS} мс: {key}", file=sys.stderr)
+        status = 1
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        ratios, regressions = compare(report['results'], baseline, args.threshold, args.noise_ms)
+        report['comparison'] = {'baseline': args.baseline, 'threshold': args.threshold,
+                                'noise_ms': args.noise_ms, 'ratios': ratios, 'regressions': regressions}
+        for key in regressions:
+            print(f"Замедление: {key} в {ratios[key]} раза", file=sys.stderr)
+        if regressions:
+            status = 1
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# benchmarks/datagen.py
+"""Генератор синтетических данных для замеров.
+
+Навыки, интересы и теги выбираются по закону Ципфа: немногие термины
+встречаются очень часто, большинство — редко, как в реальных профилях.
+Все случайные выборки идут от одного seed, поэтому данные воспроизводимы.
+"""
+import bisect
+import itertools
+import random
+import statistics
+import time
+
+# Реальные термины в начале словаря — им достаются самые частые ранги
+BASE_SKILLS = [
+    'Python', 'SQL', 'JavaScript', 'Figma', 'Java', 'C++', 'R', 'Photoshop', 'Flask', 'Django',
+    'React', 'статистика', 'Arduino', 'Excel', 'Копирайтинг', 'SMM', 'Аналитика', 'UI/UX',
+    'машинное обучение', 'Go', 'Rust', 'Kotlin', 'Swift', 'Unity', 'Docker', 'Linux',
+]
+BASE_INTERESTS = [
+    'нейросети', 'стартапы', 'биология', 'образование', 'робототехника', 'IT', 'генетика',
+    'веб-разработка', 'IoT', 'игры', 'экология', 'медицина', 'финансы', 'дизайн', 'музыка',
+]
+FIRST_NAMES = ['Иван', 'Мария', 'Алексей', 'Ольга', 'Сергей', 'Анна', 'Дмитрий', 'Елена', 'Павел', 'Наталья']
+LAST_NAMES = ['Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Васильев', 'Петрова', 'Соколов', 'Михайлова']
+STATUSES = ['planning', 'active', 'in_progress', 'completed']
+DIRECTIONS = ['Программирование', 'Дизайн', 'Биология', 'Маркетинг', 'Инженерия']
+
+# Размер словаря терминов и показатель распределения Ципфа
+VOCABULARY_SIZE = 2000
+ZIPF_EXPONENT = 1.1
+
+
+def vocabulary(base, size, prefix):
+    """Словарь из size терминов: реальные, затем синтетические"""
+    return list(base[:size]) + [f'{prefix}{i}' for i in range(len(base), size)]
+
+
+class ZipfSampler:
+    """Выборка терминов с вероятностью, обратной рангу в степени exponent"""
+
+    def __init__(self, terms, exponent=ZIPF_EXPONENT):
+        self.terms = terms
+        self.cum_weights = list(itertools.accumulate(1.0 / rank ** exponent for rank in range(1, len(terms) + 1)))
+
+    def sample(self, rng, k):
+        """k разных терминов"""
+        chosen = {}
+        total = self.cum_weights[-1]
+        while len(chosen) < min(k, len(self.terms)):
+            term = self.terms[bisect.bisect(self.cum_weights, rng.random() * total)]
+            chosen[term] = True
+        return list(chosen)
+
+
+class DataGenerator:
+    """Воспроизводимые наборы пользователей, мероприятий, проектов и сообщений"""
+
+    def __init__(self, seed=42, vocabulary_size=VOCABULARY_SIZE, exponent=ZIPF_EXPONENT):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.skills = ZipfSampler(vocabulary(BASE_SKILLS, vocabulary_size, 'skill-'), exponent)
+        self.interests = ZipfSampler(vocabulary(BASE_INTERESTS, vocabulary_size, 'interest-'), exponent)
+
+    def name(self, i):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {i}"
+
+    def terms(self, sampler, low=1, high=6):
+        return sampler.sample(self.rng, self.rng.randint(low, high))
+
+    def users(self, count):
+        """Кортежи для Database.add_users_bulk"""
+        for i in range(count):
+            yield (
+                self.name(i),
+                f"user{i}@example.com",
+                self.terms(self.skills),
+                self.terms(self.interests),
+                self.rng.choice(['', 'Ищу команду', 'Открыт к коллаборациям']),
+                self.rng.random() < 0.4,
+            )
+
+    def events(self, count):
+        """Кортежи для Database.add_events_bulk"""
+        for i in range(count):
+            day = self.rng.randint(1, 365)
+            yield (
+                f"Мероприятие {i} {' '.join(self.terms(self.interests, 1, 2))}",
+                f"Описание мероприятия {i}",
+                f"2025-{(day - 1) // 31 + 1:02d}-{(day - 1) % 28 + 1:02d} 18:00",
+                '',
+                f"Аудитория {self.rng.randint(100, 500)}",
+                self.terms(self.interests, 1, 4),
+                self.rng.choice([0, 30, 50, 100]),
+            )
+
+    def projects(self, count, owner_count):
+        """Кортежи для Database.add_projects_bulk"""
+        for i in range(count):
+            yield (
+                f"Проект {i} {' '.join(self.terms(self.skills, 1, 2))}",
+                f"Описание проекта {i}",
+                self.rng.choice(STATUSES),
+                self.rng.randint(1, owner_count),
+            )
+
+    def accounts(self, count, iterations):
+        """Кортежи для EnhancedDatabase.create_users_bulk (без PBKDF2 — хеш не проверяется в замерах)"""
+        for i in range(count):
+            yield (
+                f"student{i}",
+                f"student{i}@example.com",
+                ('x' * 64, 'y' * 64, iterations),
+                self.rng.choice(DIRECTIONS),
+                ', '.join(self.terms(self.skills)),
+            )
+
+    def student_projects(self, count, author_count):
+        """Кортежи для EnhancedDatabase.create_projects_bulk"""
+        for i in range(count):
+            skills = ', '.join(self.terms(self.skills, 1, 4))
+            yield (
+                f"Проект {i} {skills.split(', ')[0]}",
+                f"Описание проекта {i} {' '.join(self.terms(self.interests, 1, 3))}",
+                skills,
+                self.rng.randint(1, author_count),
+            )
+
+    def messages(self, count, project_count, author_count):
+        """Кортежи для EnhancedDatabase.add_messages_bulk"""
+        for i in range(count):
+            yield (
+                self.rng.randint(1, project_count),
+                self.rng.randint(1, author_count),
+                f"Сообщение {i}",
+            )
+
+
+def timed(func, *args):
+    """Выполнить func и вернуть (результат, секунды)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def summarize(samples):
+    """Сводка замеров в миллисекундах"""
+    samples = sorted(samples)
+    ms = [s * 1000 for s in samples]
+    return {
+        'calls': len(ms),
+        'min_ms': round(ms[0], 4),
+        'median_ms': round(statistics.median(ms), 4),
+        'p95_ms': round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        'mean_ms': round(statistics.fmean(ms), 4),
+    }
+
+
+def populate_collabmatch(db, generator, users, events, projects):
+    """Заполнить Database пакетными методами; вернуть время каждой вставки"""
+    timings = {}
+    _, timings['add_users_bulk'] = timed(db.add_users_bulk, list(generator.users(users)))
+    _, timings['add_events_bulk'] = timed(db.add_events_bulk, list(generator.events(events)))
+    _, timings['add_projects_bulk'] = timed(db.add_projects_bulk, list(generator.projects(projects, users)))
+    return timings
+
+
+def populate_student_collab(edb, generator, users, projects, messages):
+    """Заполнить EnhancedDatabase пакетными методами через очередь записи; вернуть время каждой вставки"""
+    timings = {}
+    _, timings['insert_users'] = timed(
+        edb.create_users_bulk, list(generator.accounts(users, edb.password_iterations)))
+    _, timings['insert_projects'] = timed(
+        edb.create_projects_bulk, list(generator.student_projects(projects, users)))
+    _, timings['insert_messages'] = timed(
+        edb.add_messages_bulk, list(generator.messages(messages, projects, users)))
+    return timings
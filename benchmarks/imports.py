@@ -0,0 +1,70 @@
+# benchmarks/imports.py
+"""Время импорта слоя данных в чистом интерпретаторе.
+
+Каждый замер запускает отдельный процесс python, поэтому кэш sys.modules
+не влияет на результат. Для путей без GUI дополнительно проверяется, что
+PyQt6 и tkinter не загружены.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.datagen import summarize
+
+# Имя замера -> (инструкция импорта, должен ли путь обходиться без GUI)
+IMPORT_TARGETS = {
+    'storage.Database': ('from storage import Database', True),
+    'storage.EnhancedDatabase': ('from storage import EnhancedDatabase', True),
+    'database': ('import database', False),
+    'registration': ('import registration', False),
+}
+GUI_PACKAGES = ('PyQt6', 'PyQt5', 'tkinter', '_tkinter')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+seconds = time.perf_counter() - start
+gui = sorted(m for m in sys.modules if m.split('.')[0] in {packages!r})
+print(json.dumps({{'seconds': seconds, 'gui': gui}}))
+'''
+
+
+def time_import(statement):
+    """Импорт в новом процессе: {'seconds', 'gui'} или {'error'}"""
+    code = CHILD.format(statement=statement, packages=GUI_PACKAGES)
+    env = dict(os.environ)
+    for name in ('COLLAB_METRICS', 'COLLAB_SLOW_QUERY_MS'):
+        env.pop(name, None)
+    proc = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {'error': lines[-1] if lines else f'код возврата {proc.returncode}'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_imports(repeat):
+    """Замеры времени импорта; для путей без GUI — список загруженных GUI-модулей"""
+    results = {}
+    for name, (statement, headless) in IMPORT_TARGETS.items():
+        samples = []
+        gui = set()
+        error = None
+        for _ in range(repeat):
+            sample = time_import(statement)
+            if 'error' in sample:
+                error = sample['error']
+                break
+            samples.append(sample['seconds'])
+            gui.update(sample['gui'])
+        if error:
+            results[name] = {'error': error}
+            continue
+        results[name] = summarize(samples)
+        if headless:
+            results[name]['gui_modules'] = sorted(gui)
+    return results
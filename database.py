@@ -1,329 +1,9 @@
 import sys
-import sqlite3
 import json
-from datetime import datetime
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon, QPixmap, QColor
-
-
-class Database:
-    def __init__(self, db_path: str = "collabmatch.db"):
-        self.db_path = db_path
-        self.init_database()
-
-    def get_connection(self):
-        """Получить соединение с базой данных"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def init_database(self):
-        """Инициализировать базу данных"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # Таблица пользователей
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT,
-                skills TEXT DEFAULT '[]',
-                interests TEXT DEFAULT '[]',
-                status TEXT DEFAULT '',
-                looking_for_project INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Таблица мероприятий
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                start_date TEXT,
-                end_date TEXT,
-                location TEXT,
-                tags TEXT DEFAULT '[]',
-                max_participants INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Таблица проектов
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                status TEXT DEFAULT 'planning',
-                owner_id INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (owner_id) REFERENCES users(id)
-            )
-        ''')
-
-        # Тестовые данные
-        cursor.execute("SELECT COUNT(*) FROM users")
-        if cursor.fetchone()[0] == 0:
-            # Тестовые пользователи
-            test_users = [
-                ('Иван Программист', 'ivan@example.com',
-                 '["Python", "SQL", "AI", "Flask"]', '["биология", "нейросети", "машинное обучение"]',
-                 'Хочу сотрудничать с биологами', 1),
-                ('Мария Биолог', 'maria@example.com',
-                 '["биоинформатика", "статистика", "R"]', '["нейросети", "генетика", "Python"]',
-                 'Ищу программиста для проекта', 1),
-                ('Алексей Дизайнер', 'alex@example.com',
-                 '["UI/UX", "Figma", "Photoshop"]', '["стартапы", "веб-разработка", "IT"]',
-                 'Открыт к коллаборациям', 1),
-                ('Ольга Маркетолог', 'olga@example.com',
-                 '["SMM", "Аналитика", "Копирайтинг"]', '["образование", "социальные проекты", "менеджмент"]',
-                 'Готова помочь с продвижением', 0),
-                ('Сергей Инженер', 'sergey@example.com',
-                 '["Arduino", "электроника", "C++"]', '["робототехника", "IoT", "программирование"]',
-                 'Ищу команду для хакатона', 1)
-            ]
-
-            for user in test_users:
-                cursor.execute('''
-                    INSERT INTO users (name, email, skills, interests, status, looking_for_project)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', user)
-
-            # Тестовые мероприятия
-            test_events = [
-                ('Нейросети в биологии',
-                 'Лекция о применении нейросетей в биологических исследованиях',
-                 '2024-12-15 18:00', '2024-12-15 20:00',
-                 'Аудитория 101', '["нейросети", "биология", "исследования"]', 50),
-                ('Стартап-уикенд',
-                 'Интенсив по созданию междисциплинарных проектов',
-                 '2024-12-20 10:00', '2024-12-21 18:00',
-                 'Коворкинг "Точка кипения"', '["стартап", "проекты", "коллаборации"]', 100),
-                ('Хакатон по биоинформатике',
-                 'Соревнование по созданию IT-решений для биологии',
-                 '2024-12-25 09:00', '2024-12-27 21:00',
-                 'Технопарк', '["хакатон", "биоинформатика", "программирование"]', 30)
-            ]
-
-            for event in test_events:
-                cursor.execute('''
-                    INSERT INTO events (title, description, start_date, end_date, location, tags, max_participants)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', event)
-
-            # Тестовые проекты
-            test_projects = [
-                ('AI для анализа ДНК', 'Проект по созданию нейросети для анализа генетических данных', 'active', 1),
-                ('EdTech платформа', 'Образовательная платформа для студентов', 'planning', 3),
-                ('Робот-помощник', 'Автоматизация лабораторных работ', 'in_progress', 5)
-            ]
-
-            for project in test_projects:
-                cursor.execute('''
-                    INSERT INTO projects (title, description, status, owner_id)
-                    VALUES (?, ?, ?, ?)
-                ''', project)
-
-        conn.commit()
-        conn.close()
-
-    def get_all_users(self):
-        """Получить всех пользователей"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users ORDER BY name")
-        users = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return users
-
-    def get_all_events(self):
-        """Получить все мероприятия"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM events ORDER BY start_date")
-        events = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return events
-
-    def get_all_projects(self):
-        """Получить все проекты"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM projects ORDER BY created_at DESC")
-        projects = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return projects
-
-    def get_user(self, user_id):
-        """Получить пользователя по ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-        conn.close()
-        return dict(user) if user else None
-
-    def add_user(self, name, email, skills, interests, collaboration_status, looking_for_project):
-        """Добавить нового пользователя"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO users (name, email, skills, interests, status, looking_for_project)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (name, email, json.dumps(skills), json.dumps(interests), collaboration_status, looking_for_project))
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return user_id
-
-    def add_event(self, title, description, start_date, end_date, location, tags, max_participants):
-        """Добавить новое мероприятие"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO events (title, description, start_date, end_date, location, tags, max_participants)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (title, description, start_date, end_date, location, json.dumps(tags), max_participants))
-        event_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return event_id
-
-    def add_project(self, title, description, status, owner_id):
-        """Добавить новый проект"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO projects (title, description, status, owner_id)
-            VALUES (?, ?, ?, ?)
-        ''', (title, description, status, owner_id))
-        project_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return project_id
-
-    def find_matches(self, user_id):
-        """Найти совпадения для пользователя"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-
-        if not user:
-            conn.close()
-            return []
-
-        user = dict(user)
-        cursor.execute("SELECT * FROM users WHERE id != ?", (user_id,))
-        all_users = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-
-        user_skills = set(json.loads(user['skills']))
-        user_interests = set(json.loads(user['interests']))
-
-        matches = []
-
-        for other_user in all_users:
-            other_skills = set(json.loads(other_user['skills']))
-            other_interests = set(json.loads(other_user['interests']))
-
-            common_skills = user_skills.intersection(other_skills)
-            common_interests = user_interests.intersection(other_interests)
-
-            if common_skills or common_interests:
-                score = len(common_skills) * 10 + len(common_interests) * 5
-                if user['looking_for_project'] and other_user['looking_for_project']:
-                    score += 20
-
-                matches.append({
-                    'user': other_user,
-                    'score': score,
-                    'common_skills': list(common_skills),
-                    'common_interests': list(common_interests)
-                })
-
-        matches.sort(key=lambda x: x['score'], reverse=True)
-        return matches
-
-    def search(self, query):
-        """Поиск по всем данным"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        search_pattern = f"%{query}%"
-
-        # Поиск пользователей
-        cursor.execute('''
-            SELECT * FROM users 
-            WHERE name LIKE ? OR email LIKE ? OR skills LIKE ? 
-            OR interests LIKE ? OR status LIKE ?
-            ORDER BY name
-        ''', (search_pattern, search_pattern, search_pattern, search_pattern, search_pattern))
-        users = [dict(row) for row in cursor.fetchall()]
-
-        # Поиск мероприятий
-        cursor.execute('''
-            SELECT * FROM events 
-            WHERE title LIKE ? OR description LIKE ? OR tags LIKE ? 
-            OR location LIKE ?
-            ORDER BY start_date
-        ''', (search_pattern, search_pattern, search_pattern, search_pattern))
-        events = [dict(row) for row in cursor.fetchall()]
-
-        # Поиск проектов
-        cursor.execute('''
-            SELECT * FROM projects 
-            WHERE title LIKE ? OR description LIKE ? OR status LIKE ?
-            ORDER BY created_at DESC
-        ''', (search_pattern, search_pattern, search_pattern))
-        projects = [dict(row) for row in cursor.fetchall()]
-
-        conn.close()
-
-        return {
-            'users': users,
-            'events': events,
-            'projects': projects
-        }
-
-    def get_stats(self):
-        """Получить статистику"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM events")
-        total_events = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM users WHERE looking_for_project = 1")
-        looking_for_project = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM projects")
-        total_projects = cursor.fetchone()[0]
-
-        # Подсчет уникальных навыков
-        cursor.execute("SELECT skills FROM users")
-        all_skills = set()
-        for row in cursor.fetchall():
-            skills = json.loads(row[0])
-            all_skills.update(skills)
-        unique_skills = len(all_skills)
-
-        conn.close()
-
-        return {
-            'total_users': total_users,
-            'total_events': total_events,
-            'looking_for_project': looking_for_project,
-            'total_projects': total_projects,
-            'unique_skills': unique_skills
-        }
+from storage.collabmatch import CachedDatabase, Database
 
 
 class UserCard(QFrame):
@@ -499,7 +179,7 @@ class ProjectCard(QFrame):
 class CollabMatchApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.db = Database()
+        self.db = CachedDatabase()
         self.setup_ui()
         self.load_data()
 
@@ -844,7 +524,7 @@ class CollabMatchApp(QMainWindow):
             if widget:
                 widget.deleteLater()
 
-        matches = self.db.find_matches(user_id)
+        matches = self.db.find_matches(user_id, limit=15)
 
         if not matches:
             # Показываем сообщение, что совпадений нет
@@ -866,12 +546,13 @@ class CollabMatchApp(QMainWindow):
         # Заголовок
         user = self.db.get_user(user_id)
         user_name = user['name'] if user else "Неизвестный пользователь"
-        title = QLabel(f"🎯 Найдено {len(matches)} совпадений для {user_name}:")
+        total = self.db.count_matches(user_id)
+        title = QLabel(f"🎯 Найдено {total} совпадений для {user_name}:")
         title.setStyleSheet("font-size: 18px; font-weight: bold; color: #2c3e50; padding: 10px;")
         self.matches_layout.addWidget(title)
 
         # Отображаем совпадения
-        for match in matches[:15]:  # Показываем первые 15
+        for match in matches:  # Показываем первые 15
             match_widget = self.create_match_widget(match)
             self.matches_layout.addWidget(match_widget)
 
@@ -975,7 +656,7 @@ class CollabMatchApp(QMainWindow):
                 widget.deleteLater()
 
         # Выполняем поиск
-        results = self.db.search(query)
+        results = self.db.search_substring(query)
 
         # Обновляем заголовок
         self.search_title.setText(f"Результаты поиска: '{query}'")
@@ -1216,6 +897,7 @@ class CollabMatchApp(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
+            self.db.close()
             event.accept()
         else:
             event.ignore()
@@ -4,7 +4,8 @@ from datetime import datetime
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import Qt, QPoint
 from PyQt6.QtGui import QFont, QPainter, QPen, QColor, QPixmap, QFontMetrics
-from database import Database
+from storage import CachedDatabase
+from qt_db import QtDatabase
 
 
 class SimpleDrawingCanvas(QWidget):
@@ -1185,7 +1186,9 @@ class EventCard(QFrame):
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.db = Database()
+        self.db = CachedDatabase()
+        # Запросы к базе выполняются в фоне, чтобы окно не зависало на SQLite
+        self.async_db = QtDatabase(self.db, parent=self)
         self.all_users = []
         self.all_events = []
         self.all_tags = set()
@@ -1436,25 +1439,40 @@ class MainWindow(QMainWindow):
         self.search_results_layout = QVBoxLayout(self.search_container)
         self.search_scroll_layout.addWidget(self.search_container)
 
+    def db_error(self, message):
+        """Обработчик ошибки фонового запроса: сообщение в окне"""
+        return lambda e: QMessageBox.critical(self, "Ошибка", f"{message}: {str(e)}")
+
     def load_data(self):
-        """Загрузить все данные"""
-        try:
-            # Загрузка пользователей
-            self.all_users = self.db.get_all_users()
+        """Загрузить все данные (в фоне)"""
+        self.async_db.run(self.fetch_data, key='load_data', on_result=self.show_data,
+                          on_error=self.db_error("Не удалось загрузить данные"))
 
-            # Загрузка мероприятий
-            self.all_events = self.db.get_all_events()
+    def fetch_data(self):
+        """Прочитать пользователей, мероприятия и теги (в рабочем потоке)"""
+        # Загрузка пользователей
+        users = self.db.get_all_users()
 
-            # Собираем все уникальные навыки
-            self.all_tags.clear()
-            for user in self.all_users:
-                skills = json.loads(user['skills'])
-                self.all_tags.update(skills)
+        # Загрузка мероприятий
+        events = self.db.get_all_events()
 
-            # Собираем все уникальные теги мероприятий
-            for event in self.all_events:
-                tags = json.loads(event['tags'])
-                self.all_tags.update(tags)
+        # Собираем все уникальные навыки
+        tags = set()
+        for user in users:
+            skills = json.loads(user['skills'])
+            tags.update(skills)
+
+        # Собираем все уникальные теги мероприятий
+        for event in events:
+            event_tags = json.loads(event['tags'])
+            tags.update(event_tags)
+
+        return users, events, tags
+
+    def show_data(self, data):
+        """Отобразить загруженные данные"""
+        try:
+            self.all_users, self.all_events, self.all_tags = data
 
             # Обновляем комбобоксы фильтров
             self.update_filter_comboboxes()
@@ -1612,9 +1630,20 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Внимание", "Выберите пользователя")
             return
 
-        try:
-            matches = self.db.find_matches(user_id)
+        self.async_db.run(self.fetch_matches, user_id, key='find_matches', on_result=self.show_matches,
+                          on_error=self.db_error("Не удалось найти совпадения"))
+
+    def fetch_matches(self, user_id):
+        """Прочитать совпадения, пользователя и их общее число (в рабочем потоке)"""
+        matches = self.db.find_matches(user_id, limit=15)
+        if not matches:
+            return matches, None, 0
+        return matches, self.db.get_user(user_id), self.db.count_matches(user_id)
 
+    def show_matches(self, data):
+        """Отобразить найденные совпадения"""
+        matches, user, total = data
+        try:
             for i in reversed(range(self.matches_layout.count())):
                 widget = self.matches_layout.itemAt(i).widget()
                 if widget:
@@ -1627,13 +1656,12 @@ class MainWindow(QMainWindow):
                 self.matches_layout.addWidget(label)
                 return
 
-            user = self.db.get_user(user_id)
             user_name = user['name'] if user else "Неизвестный пользователь"
-            title = QLabel(f"🎯 Найдено {len(matches)} совпадений для {user_name}:")
+            title = QLabel(f"🎯 Найдено {total} совпадений для {user_name}:")
             title.setStyleSheet("font-size: 16px; font-weight: bold; padding: 10px;")
             self.matches_layout.addWidget(title)
 
-            for match in matches[:15]:
+            for match in matches:
                 match_widget = self.create_match_widget(match)
                 self.matches_layout.addWidget(match_widget)
 
@@ -1720,16 +1748,21 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Поиск", "Введите поисковый запрос")
             return
 
-        try:
-            self.tab_widget.setCurrentIndex(3)
+        self.tab_widget.setCurrentIndex(3)
 
-            for i in reversed(range(self.search_results_layout.count())):
-                widget = self.search_results_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
+        for i in reversed(range(self.search_results_layout.count())):
+            widget = self.search_results_layout.itemAt(i).widget()
+            if widget:
+                widget.deleteLater()
 
-            results = self.db.search(query)
+        self.search_title.setText(f"Поиск: '{query}'...")
+        self.async_db.call('search_substring', query, key='search',
+                           on_result=lambda results: self.show_search_results(query, results),
+                           on_error=self.db_error("Ошибка поиска"))
 
+    def show_search_results(self, query, results):
+        """Отобразить результаты поиска"""
+        try:
             self.search_title.setText(f"Результаты поиска: '{query}'")
 
             total_results = len(results.get('users', [])) + len(results.get('events', [])) + len(
@@ -1876,22 +1909,25 @@ class MainWindow(QMainWindow):
             skills = [s.strip() for s in skills_input.text().split(',') if s.strip()]
             interests = [i.strip() for i in interests_input.text().split(',') if i.strip()]
 
-            try:
-                user_id = self.db.add_user(
-                    name=name,
-                    email=email,
-                    skills=skills,
-                    interests=interests,
-                    collaboration_status=status_input.text().strip(),
-                    looking_for_project=looking_checkbox.isChecked()
-                )
-
-                QMessageBox.information(dialog, "Успех", f"Пользователь добавлен с ID: {user_id}")
-                dialog.accept()
-                self.load_data()
-
-            except Exception as e:
-                QMessageBox.critical(dialog, "Ошибка", f"Не удалось добавить пользователя: {str(e)}")
+            # Запись идет в фоне; до ответа кнопка отключена, чтобы не добавить дважды
+            save_button.setEnabled(False)
+            self.async_db.call('add_user', key=None,
+                               on_result=user_added, on_error=user_failed,
+                               name=name,
+                               email=email,
+                               skills=skills,
+                               interests=interests,
+                               collaboration_status=status_input.text().strip(),
+                               looking_for_project=looking_checkbox.isChecked())
+
+        def user_added(user_id):
+            QMessageBox.information(dialog, "Успех", f"Пользователь добавлен с ID: {user_id}")
+            dialog.accept()
+            self.load_data()
+
+        def user_failed(e):
+            save_button.setEnabled(True)
+            QMessageBox.critical(dialog, "Ошибка", f"Не удалось добавить пользователя: {str(e)}")
 
         save_button.clicked.connect(save_user)
         cancel_button.clicked.connect(dialog.reject)
@@ -1951,29 +1987,38 @@ class MainWindow(QMainWindow):
 
             tags = [t.strip() for t in tags_input.text().split(',') if t.strip()]
 
-            try:
-                event_id = self.db.add_event(
-                    title=title,
-                    description=description_input.toPlainText().strip(),
-                    start_date=start_date,
-                    end_date=end_date_input.text().strip(),
-                    location=location_input.text().strip(),
-                    tags=tags,
-                    max_participants=0
-                )
-
-                QMessageBox.information(dialog, "Успех", f"Мероприятие добавлено с ID: {event_id}")
-                dialog.accept()
-                self.load_data()
-
-            except Exception as e:
-                QMessageBox.critical(dialog, "Ошибка", f"Не удалось добавить мероприятие: {str(e)}")
+            # Запись идет в фоне; до ответа кнопка отключена, чтобы не добавить дважды
+            save_button.setEnabled(False)
+            self.async_db.call('add_event', key=None,
+                               on_result=event_added, on_error=event_failed,
+                               title=title,
+                               description=description_input.toPlainText().strip(),
+                               start_date=start_date,
+                               end_date=end_date_input.text().strip(),
+                               location=location_input.text().strip(),
+                               tags=tags,
+                               max_participants=0)
+
+        def event_added(event_id):
+            QMessageBox.information(dialog, "Успех", f"Мероприятие добавлено с ID: {event_id}")
+            dialog.accept()
+            self.load_data()
+
+        def event_failed(e):
+            save_button.setEnabled(True)
+            QMessageBox.critical(dialog, "Ошибка", f"Не удалось добавить мероприятие: {str(e)}")
 
         save_button.clicked.connect(save_event)
         cancel_button.clicked.connect(dialog.reject)
 
         dialog.exec()
 
+    def closeEvent(self, event):
+        """Остановить фоновые запросы и закрыть соединения"""
+        self.async_db.close()
+        self.db.close()
+        super().closeEvent(event)
+
 
 def main():
     app = QApplication(sys.argv)
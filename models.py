@@ -16,6 +16,30 @@ project_members = db.Table('project_members',
                            db.Column('joined_at', db.DateTime, default=datetime.utcnow)
                            )
 
+# Таблицы связей пользователь-навык и пользователь-интерес (общий справочник терминов)
+user_skill = db.Table('user_skill',
+                      db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+                      db.Column('skill_id', db.Integer, db.ForeignKey('skill.id'), primary_key=True, index=True)
+                      )
+
+user_interest = db.Table('user_interest',
+                         db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+                         db.Column('skill_id', db.Integer, db.ForeignKey('skill.id'), primary_key=True, index=True)
+                         )
+
+
+class Skill(db.Model):
+    __tablename__ = 'skill'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
+
 
 class User(db.Model):
     __tablename__ = 'user'
@@ -29,6 +53,12 @@ class User(db.Model):
     skills = db.Column(db.Text, nullable=False, default='[]')  # JSON список
     interests = db.Column(db.Text, nullable=False, default='[]')  # JSON список
 
+    # Нормализованные копии навыков и интересов для поиска по индексу
+    skill_terms = db.relationship('Skill', secondary=user_skill,
+                                  backref=db.backref('users_with_skill', lazy='dynamic'))
+    interest_terms = db.relationship('Skill', secondary=user_interest,
+                                     backref=db.backref('users_with_interest', lazy='dynamic'))
+
     # Статусы пользователя
     status = db.Column(db.String(50), nullable=False, default='active')
     collaboration_status = db.Column(db.String(100), default='')  # "Хочу сотрудничать", "Ищу команду" и т.д.
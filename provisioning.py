@@ -0,0 +1,172 @@
+# provisioning.py
+"""Массовое создание аккаунтов StudentCollab из списка студентов.
+
+    python provisioning.py roster.csv --db student_collab.db
+    python provisioning.py roster.jsonl --generate-passwords --credentials credentials.csv
+
+Поля списка: username, email, password (или --generate-passwords), direction, skills.
+Пароли хешируются PBKDF2 в пуле процессов на всех ядрах, пока основной
+процесс вставляет уже готовые пакеты, каждый — одной транзакцией.
+Строки с ошибками и занятыми email/именами не прерывают загрузку, а попадают в отчет.
+"""
+import argparse
+import csv
+import json
+import os
+import secrets
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from storage.importer import optional, read_records, required
+from storage.passwords import make_password_record
+
+BATCH_SIZE = 500
+
+
+def hash_batch(passwords, iterations):
+    """Записи (hash, salt, iterations) для пакета паролей (выполняется в процессе пула)"""
+    return [make_password_record(password, iterations) for password in passwords]
+
+
+def account_row(record, generate_passwords=False):
+    """(username, email, password, direction, skills, пароль сгенерирован) из записи файла"""
+    password = optional(record, 'password')
+    generated = not password
+    if generated:
+        if not generate_passwords:
+            raise ValueError("не заполнено поле 'password'")
+        password = secrets.token_urlsafe(9)
+    elif len(password) < 6:
+        raise ValueError("пароль короче 6 символов")
+    return (
+        required(record, 'username'),
+        required(record, 'email'),
+        password,
+        optional(record, 'direction'),
+        optional(record, 'skills'),
+        generated,
+    )
+
+
+def read_roster(path, fmt=None, generate_passwords=False):
+    """Прочитать и проверить список: (строки [(номер, row)], ошибки [(номер, сообщение)])"""
+    rows = []
+    errors = []
+    usernames = {}
+    emails = {}
+    for line_no, record in read_records(path, fmt):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            row = account_row(record, generate_passwords)
+        except (ValueError, TypeError) as e:
+            errors.append((line_no, str(e)))
+            continue
+        username, email = row[0], row[1]
+        if username in usernames:
+            errors.append((line_no, f"имя пользователя повторяется (строка {usernames[username]})"))
+            continue
+        if email in emails:
+            errors.append((line_no, f"email повторяется (строка {emails[email]})"))
+            continue
+        usernames[username] = emails[email] = line_no
+        rows.append((line_no, row))
+    return rows, errors
+
+
+def provision_accounts(db, rows, workers=None, batch_size=BATCH_SIZE):
+    """Создать аккаунты для строк [(номер, row), ...], row — результат account_row.
+
+    Возвращает {'created': N, 'ids': [...], 'errors': [(номер, сообщение), ...],
+    'generated': [(username, email, password), ...] — созданные аккаунты со сгенерированным паролем}.
+    """
+    report = {'created': 0, 'ids': [], 'errors': [], 'generated': []}
+
+    # Занятые имена и email отсеиваем до хеширования, чтобы не тратить на них время
+    taken_usernames, taken_emails = db.find_existing_accounts([row[0] for _, row in rows],
+                                                              [row[1] for _, row in rows])
+    pending = []
+    for line_no, row in rows:
+        if row[0] in taken_usernames:
+            report['errors'].append((line_no, "имя пользователя уже используется"))
+        elif row[1] in taken_emails:
+            report['errors'].append((line_no, "email уже используется"))
+        else:
+            pending.append((line_no, row))
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashed = pool.map(hash_batch, [[row[2] for _, row in batch] for batch in batches],
+                          [db.password_iterations] * len(batches))
+        # Пакеты приходят по порядку; пока вставляется один, пул хеширует следующие
+        for batch, records in zip(batches, hashed):
+            users = [(row[0], row[1], record, row[3], row[4]) for (_, row), record in zip(batch, records)]
+            for (line_no, row), (user_id, error) in zip(batch, db.create_users_bulk(users)):
+                if error:
+                    report['errors'].append((line_no, error))
+                else:
+                    report['created'] += 1
+                    report['ids'].append(user_id)
+                    if row[5]:
+                        report['generated'].append((row[0], row[1], row[2]))
+
+    report['errors'].sort()
+    return report
+
+
+def write_credentials(path, accounts):
+    """CSV с начальными паролями для рассылки студентам"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['username', 'email', 'password'])
+        writer.writerows(accounts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python provisioning.py', description="Массовое создание аккаунтов")
+    parser.add_argument('roster', help="список студентов (.csv или .jsonl)")
+    parser.add_argument('--db', default='student_collab.db', help="путь к базе (по умолчанию student_collab.db)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="по умолчанию по расширению файла")
+    parser.add_argument('--workers', type=int, help="процессов для хеширования (по умолчанию все ядра)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="строк в одной транзакции")
+    parser.add_argument('--iterations', type=int, help="итераций PBKDF2 (по умолчанию COLLAB_PBKDF2_ITERATIONS)")
+    parser.add_argument('--generate-passwords', action='store_true',
+                        help="создать случайные пароли для строк без password")
+    parser.add_argument('--credentials',
+                        help="CSV для сгенерированных паролей (обязателен с --generate-passwords)")
+    parser.add_argument('--output', help="файл для JSON-отчета (по умолчанию stdout)")
+    parser.add_argument('--strict', action='store_true', help="код возврата 1, если есть ошибочные строки")
+    args = parser.parse_args(argv)
+    if args.generate_passwords and not args.credentials:
+        parser.error("с --generate-passwords нужен --credentials")
+
+    from storage import EnhancedDatabase
+
+    db = EnhancedDatabase(args.db) if args.iterations is None else EnhancedDatabase(args.db, args.iterations)
+    start = time.perf_counter()
+    rows, errors = read_roster(args.roster, args.format, args.generate_passwords)
+    report = provision_accounts(db, rows, args.workers, args.batch_size)
+    seconds = time.perf_counter() - start
+    db.close()
+
+    if args.credentials:
+        write_credentials(args.credentials, report['generated'])
+    summary = {
+        'created': report['created'],
+        'errors': sorted(errors + report['errors']),
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(report['created'] / seconds, 1) if seconds else None,
+        'workers': args.workers or os.cpu_count(),
+    }
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 1 if summary['errors'] and args.strict else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
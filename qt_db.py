@@ -0,0 +1,70 @@
+# qt_db.py
+from concurrent.futures import CancelledError
+from functools import partial
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from async_db import DatabaseExecutor
+
+
+class QtDatabase(QObject):
+    """Адаптер Database для PyQt6: запросы идут в пуле потоков,
+    а результат возвращается в поток GUI через сигнал.
+
+    Результаты вытесненных запросов (тот же key) отбрасываются,
+    поэтому обработчик получает только ответ на последний запрос.
+    """
+
+    finished = pyqtSignal(object, object)   # запрос, результат
+    failed = pyqtSignal(object, object)     # запрос, исключение
+
+    def __init__(self, db, max_workers=4, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.executor = DatabaseExecutor(db, max_workers)
+        self._callbacks = {}
+        self.finished.connect(self._on_finished)
+        self.failed.connect(self._on_failed)
+
+    def call(self, name, *args, key=None, on_result=None, on_error=None, **kwargs):
+        """Вызвать метод Database по имени в фоне"""
+        return self.run(getattr(self.db, name), *args, key=key,
+                        on_result=on_result, on_error=on_error, **kwargs)
+
+    def run(self, func, *args, key=None, on_result=None, on_error=None, **kwargs):
+        """Выполнить функцию в фоне; on_result/on_error вызываются в потоке GUI"""
+        request = self.executor.submit(func, *args, key=key, **kwargs)
+        self._callbacks[request] = (on_result, on_error)
+        request.future.add_done_callback(partial(self._done, request))
+        return request
+
+    def cancel(self, request):
+        """Отменить запрос"""
+        self.executor.cancel(request)
+
+    def _done(self, request, future):
+        """Завершение в рабочем потоке: передать результат сигналом"""
+        if future.cancelled():
+            self.failed.emit(request, CancelledError())
+            return
+        error = future.exception()
+        if error is None:
+            self.finished.emit(request, future.result())
+        else:
+            self.failed.emit(request, error)
+
+    def _on_finished(self, request, result):
+        on_result, _ = self._callbacks.pop(request, (None, None))
+        if on_result is not None and not request.cancelled:
+            on_result(result)
+
+    def _on_failed(self, request, error):
+        _, on_error = self._callbacks.pop(request, (None, None))
+        if request.cancelled or isinstance(error, CancelledError):
+            return
+        if on_error is not None:
+            on_error(error)
+
+    def close(self):
+        """Остановить пул потоков"""
+        self.executor.shutdown()
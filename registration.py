@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
-import hashlib
 import random
-import os
+from concurrent.futures import ThreadPoolExecutor
+from storage.passwords import check_password, make_password_record
+from storage.student_collab import MESSAGES_PAGE_SIZE, EnhancedDatabase
 
 ICTIB_COLORS = {
     'primary': '#0056b3', 'primary_light': '#1a6bc4', 'primary_dark': '#004a99',
@@ -12,6 +12,11 @@ ICTIB_COLORS = {
     'dark': '#212529', 'gray': '#6c757d',
 }
 
+# Период опроса фоновой проверки пароля, мс
+AUTH_POLL_MS = 30
+# Период проверки новых сообщений в открытом чате, мс
+CHAT_POLL_MS = 2000
+
 class FastAnimatedBackground:
     def __init__(self, canvas, width, height):
         self.canvas = canvas
@@ -69,301 +74,16 @@ class FastAnimatedBackground:
                 particle['y'] + particle['size'])
         self.canvas.after(50, self.animate)
 
-class EnhancedDatabase:
-    def __init__(self):
-        # Используем файловую базу данных для сохранения данных
-        db_path = "student_collab.db"
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
-        self.init_db()
-    
-    def init_db(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE,
-                email TEXT UNIQUE,
-                password_hash TEXT,
-                password_salt TEXT,
-                direction TEXT,
-                skills TEXT,
-                avatar TEXT DEFAULT '👤',
-                bio TEXT DEFAULT '',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT,
-                description TEXT,
-                skills TEXT,
-                author_id INTEGER,
-                category TEXT DEFAULT 'Другое',
-                status TEXT DEFAULT 'open',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (author_id) REFERENCES users (id)
-            )
-            ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_id INTEGER,
-                user_id INTEGER,
-                message TEXT,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (project_id) REFERENCES projects (id),
-                FOREIGN KEY (user_id) REFERENCES users (id),
-                UNIQUE(project_id, user_id)
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS project_members (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_id INTEGER,
-                user_id INTEGER,
-                role TEXT DEFAULT 'member',
-                joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (project_id) REFERENCES projects (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_id INTEGER,
-                user_id INTEGER,
-                message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (project_id) REFERENCES projects (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        self.conn.commit()
-    
-    def create_user(self, username, email, password, direction, skills='', avatar='👤', bio=''):
-        try:
-            # Генерируем соль и хешируем пароль
-            salt = os.urandom(32).hex()
-            password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000).hex()
-            
-            self.cursor.execute('''
-                INSERT INTO users (username, email, password_hash, password_salt, direction, skills, avatar, bio)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (username, email, password_hash, salt, direction, skills, avatar, bio))
-            self.conn.commit()
-            return self.cursor.lastrowid
-        except Exception as e:
-            print(f"Error creating user: {e}")
-            return None
-    
-    def verify_password(self, email, password):
-        user = self.get_user_by_email(email)
-        if not user:
-            return False
-        
-        password_hash = user[3]
-        salt = user[4]
-        
-        # Хешируем введенный пароль с той же солью
-        hashed_input = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000).hex()
-        
-        return hashed_input == password_hash
-    
-    def get_user_by_email(self, email):
-        self.cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
-        return self.cursor.fetchone()
-    
-    def get_user_by_id(self, user_id):
-        self.cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        return self.cursor.fetchone()
-    
-    def update_user(self, user_id, username=None, direction=None, skills=None, bio=None):
-        try:
-            updates = []
-            params = []
-            
-            if username:
-                updates.append("username = ?")
-                params.append(username)
-            if direction:
-                updates.append("direction = ?")
-                params.append(direction)
-            if skills is not None:
-                updates.append("skills = ?")
-                params.append(skills)
-            if bio is not None:
-                updates.append("bio = ?")
-                params.append(bio)
-            
-            if not updates:
-                return False
-            
-            params.append(user_id)
-            query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
-            self.cursor.execute(query, tuple(params))
-            self.conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error updating user: {e}")
-            return False
-    
-    def get_all_projects(self, search_query="", category_filter="all", skills_filter=""):
-        query = '''
-            SELECT p.*, u.username as author_name 
-            FROM projects p 
-            LEFT JOIN users u ON p.author_id = u.id 
-            WHERE p.status = "open"
-        '''
-        params = []
-        
-        if search_query:
-            query += " AND (p.title LIKE ? OR p.description LIKE ? OR p.skills LIKE ?)"
-            search_term = f"%{search_query}%"
-            params.extend([search_term, search_term, search_term])
-        
-        if category_filter != "all":
-            query += " AND p.category = ?"
-            params.append(category_filter)
-        
-        if skills_filter:
-            query += " AND p.skills LIKE ?"
-            params.append(f"%{skills_filter}%")
-        
-        query += " ORDER BY p.created_at DESC"
-        
-        self.cursor.execute(query, tuple(params))
-        return self.cursor.fetchall()
-    
-    def get_all_categories(self):
-        self.cursor.execute('SELECT DISTINCT category FROM projects WHERE category IS NOT NULL ORDER BY category')
-        categories = [row[0] for row in self.cursor.fetchall()]
-        return ['Все категории'] + categories
-    
-    def create_project(self, title, description, skills, author_id):
-        category = self.detect_category(title, description, skills)
-        self.cursor.execute('''
-            INSERT INTO projects (title, description, skills, author_id, category)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (title, description, skills, author_id, category))
-        self.conn.commit()
-        project_id = self.cursor.lastrowid
-        self.add_project_member(project_id, author_id, 'creator')
-        return project_id
-    
-    def detect_category(self, title, description, skills):
-        text = f"{title} {description} {skills}".lower()
-        categories = {
-            'Веб-разработка': ['веб', 'web', 'сайт', 'frontend', 'backend', 'fullstack', 'html', 'css', 'javascript'],
-            'Мобильная разработка': ['мобильн', 'android', 'ios', 'flutter', 'react native', 'приложени'],
-            'Дизайн': ['дизайн', 'ui', 'ux', 'figma', 'photoshop', 'графическ', 'интерфейс'],
-            'Анализ данных': ['анализ', 'data', 'данн', 'python', 'pandas', 'numpy', 'статистик'],
-            'Программирование': ['программир', 'код', 'алгоритм', 'разработк', 'java', 'c++', 'python'],
-            'Игры': ['игр', 'unity', 'unreal', 'гейм', 'game'],
-            'ИИ и ML': ['ии', 'ai', 'машин', 'нейрон', 'ml', 'tensorflow'],
-        }
-        for category, keywords in categories.items():
-            for keyword in keywords:
-                if keyword in text:
-                    return category
-        return 'Другое'
-    
-    def apply_to_project(self, project_id, user_id, message=""):
-        try:
-            # Проверяем, не подана ли уже заявка
-            self.cursor.execute('SELECT id FROM applications WHERE project_id = ? AND user_id = ?', 
-                              (project_id, user_id))
-            if self.cursor.fetchone():
-                return False
-                
-            self.cursor.execute('''
-                INSERT INTO applications (project_id, user_id, message)
-                VALUES (?, ?, ?)
-            ''', (project_id, user_id, message))
-            self.conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error applying to project: {e}")
-            return False
-    
-    def get_project_members(self, project_id):
-        self.cursor.execute('''
-            SELECT u.id, u.username, u.avatar, u.direction, pm.role, pm.joined_at
-            FROM project_members pm
-            JOIN users u ON pm.user_id = u.id
-            WHERE pm.project_id = ?
-            ORDER BY pm.joined_at
-        ''', (project_id,))
-        return self.cursor.fetchall()
-    
-    def add_project_member(self, project_id, user_id, role='member'):
-        try:
-            self.cursor.execute('''
-                INSERT INTO project_members (project_id, user_id, role)
-                VALUES (?, ?, ?)
-            ''', (project_id, user_id, role))
-            self.conn.commit()
-            return True
-        except:
-            return False
-    
-    def get_project_messages(self, project_id, limit=50):
-        self.cursor.execute('''
-            SELECT m.*, u.username, u.avatar
-            FROM messages m
-            JOIN users u ON m.user_id = u.id
-            WHERE m.project_id = ?
-            ORDER BY m.created_at DESC
-            LIMIT ?
-        ''', (project_id, limit))
-        return self.cursor.fetchall()
-    
-    def add_message(self, project_id, user_id, message):
-        try:
-            self.cursor.execute('''
-                INSERT INTO messages (project_id, user_id, message)
-                VALUES (?, ?, ?)
-            ''', (project_id, user_id, message))
-            self.conn.commit()
-            return True
-        except:
-            return False
-    
-    def get_user_projects(self, user_id):
-        self.cursor.execute('SELECT * FROM projects WHERE author_id = ? ORDER BY created_at DESC', (user_id,))
-        return self.cursor.fetchall()
-    
-    def get_user_applications(self, user_id):
-        self.cursor.execute('''
-            SELECT 
-                a.id,
-                a.project_id,
-                a.user_id,
-                a.message,
-                a.status,
-                a.created_at,
-                p.title,
-                p.status as project_status,
-                u.username as author_name
-            FROM applications a
-            JOIN projects p ON a.project_id = p.id
-            JOIN users u ON p.author_id = u.id
-            WHERE a.user_id = ?
-            ORDER BY a.created_at DESC
-        ''', (user_id,))
-        return self.cursor.fetchall()
-
 class StudentCollabApp:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("🎓 StudentCollab | ИКТИБ ЮФУ")
         self.root.geometry("1200x700")
         self.db = EnhancedDatabase()
+        # Пул для хеширования паролей: pbkdf2_hmac отпускает GIL
+        self.auth_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='auth')
+        self.auth_progress = None
+        self.chat_state = None
         self.current_user = None
         self.current_user_id = None
         self.colors = ICTIB_COLORS
@@ -439,9 +159,10 @@ class StudentCollabApp:
         self.password_entry = tk.Entry(card, font=('Arial', 12), width=30, show='•')
         self.password_entry.pack(pady=5)
         
-        tk.Button(card, text="ВОЙТИ", font=('Arial', 12, 'bold'),
-                 bg=self.colors['primary'], fg='white', padx=30, pady=10,
-                 command=self.login).pack(pady=20)
+        self.login_button = tk.Button(card, text="ВОЙТИ", font=('Arial', 12, 'bold'),
+                                      bg=self.colors['primary'], fg='white', padx=30, pady=10,
+                                      command=self.login)
+        self.login_button.pack(pady=20)
         
         tk.Button(card, text="📝 РЕГИСТРАЦИЯ", font=('Arial', 11),
                  bg=self.colors['light'], fg=self.colors['dark'],
@@ -477,9 +198,10 @@ class StudentCollabApp:
                 entry.pack(pady=5)
             self.reg_entries[key] = entry
         
-        tk.Button(card, text="✅ ЗАРЕГИСТРИРОВАТЬСЯ", font=('Arial', 12, 'bold'),
-                 bg=self.colors['success'], fg='white', padx=30, pady=10,
-                 command=self.register).pack(pady=20)
+        self.register_button = tk.Button(card, text="✅ ЗАРЕГИСТРИРОВАТЬСЯ", font=('Arial', 12, 'bold'),
+                                         bg=self.colors['success'], fg='white', padx=30, pady=10,
+                                         command=self.register)
+        self.register_button.pack(pady=20)
         
         tk.Button(card, text="Отмена", font=('Arial', 11),
                  bg=self.colors['light'], fg=self.colors['dark'],
@@ -493,8 +215,25 @@ class StudentCollabApp:
             messagebox.showwarning("Ошибка", "Заполните все поля!")
             return
         
-        if self.db.verify_password(email, password):
-            user = self.db.get_user_by_email(email)
+        # Хеширование PBKDF2 — в рабочем потоке, окно и анимация не замирают
+        found = self.db.get_password_record(email)
+        user_id, record = found if found else (None, None)
+        self.set_auth_busy(self.login_button, True)
+        self.run_in_background(check_password, password, record, self.db.password_iterations,
+                               on_done=lambda future: self.finish_login(self.login_button, user_id, future))
+    
+    def finish_login(self, button, user_id, future):
+        self.set_auth_busy(button, False)
+        try:
+            ok, new_record = future.result()
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось проверить пароль: {e}")
+            return
+        
+        if ok:
+            if new_record:
+                self.db.update_password_record(user_id, new_record)
+            user = self.db.get_user_by_id(user_id)
             self.current_user = user[1]
             self.current_user_id = user[0]
             self.show_main_screen()
@@ -519,10 +258,22 @@ class StudentCollabApp:
             messagebox.showerror("Ошибка", "Пароль < 6 символов!")
             return
         
-        user_id = self.db.create_user(
+        self.set_auth_busy(self.register_button, True)
+        self.run_in_background(make_password_record, data['password'], self.db.password_iterations,
+                               on_done=lambda future: self.finish_register(self.register_button, data, future))
+    
+    def finish_register(self, button, data, future):
+        self.set_auth_busy(button, False)
+        try:
+            record = future.result()
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить пароль: {e}")
+            return
+        
+        user_id = self.db.create_user_with_hash(
             username=data['username'],
             email=data['email'],
-            password=data['password'],
+            record=record,
             direction=data['direction'],
             skills=data.get('skills', '')
         )
@@ -535,6 +286,33 @@ class StudentCollabApp:
         else:
             messagebox.showerror("Ошибка", "Email или имя пользователя уже используется!")
     
+    def run_in_background(self, func, *args, on_done):
+        """Выполнить func в пуле потоков; on_done(future) вызывается в потоке Tk через root.after"""
+        future = self.auth_pool.submit(func, *args)
+        
+        def poll():
+            if future.done():
+                on_done(future)
+            else:
+                self.root.after(AUTH_POLL_MS, poll)
+        self.root.after(AUTH_POLL_MS, poll)
+        return future
+    
+    def set_auth_busy(self, button, busy):
+        """Заблокировать кнопку и показать индикатор, пока вычисляется хеш"""
+        if busy:
+            button.config(state='disabled')
+            self.auth_progress = ttk.Progressbar(button.master, mode='indeterminate', length=200)
+            self.auth_progress.pack(after=button, pady=(0, 10))
+            self.auth_progress.start(15)
+        else:
+            # Пользователь мог уйти с экрана, пока шла проверка
+            if self.auth_progress is not None and self.auth_progress.winfo_exists():
+                self.auth_progress.destroy()
+            self.auth_progress = None
+            if button.winfo_exists():
+                button.config(state='normal')
+    
     def show_main_screen(self):
         self.clear_screen()
         
@@ -892,54 +670,45 @@ class StudentCollabApp:
         messages_container = tk.Frame(messages_canvas, bg='white')
         
         messages_canvas.create_window((0, 0), window=messages_container, anchor='nw')
-        messages_canvas.configure(yscrollcommand=messages_scrollbar.set)
+        messages_container.bind('<Configure>',
+                                lambda e: messages_canvas.configure(scrollregion=messages_canvas.bbox('all')))
+        messages_canvas.configure(yscrollcommand=self.on_chat_scroll)
         
         messages_canvas.pack(side='left', fill='both', expand=True)
         messages_scrollbar.pack(side='right', fill='y')
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.root.bind_all(sequence, self.on_chat_wheel)
+        
+        # Границы загруженной истории; loading — пока не прокрутили вниз, старое не грузим
+        if self.chat_state and self.chat_state['poll']:
+            self.root.after_cancel(self.chat_state['poll'])
+        self.chat_state = {
+            'project_id': project_id, 'canvas': messages_canvas, 'scrollbar': messages_scrollbar,
+            'container': messages_container, 'oldest_id': None, 'newest_id': None,
+            'has_more': False, 'loading': True, 'placeholder': None, 'poll': None,
+        }
         
-        # Загружаем сообщения
+        # Последняя страница сообщений; более старые подгружаются при прокрутке вверх
         messages = self.db.get_project_messages(project_id)
         
         if messages:
             for msg in reversed(messages):
-                msg_id, project_id, user_id, message, created_at, username, avatar = msg
-                
-                if user_id == self.current_user_id:
-                    bg_color = self.colors['primary_light']
-                    fg_color = 'white'
-                    anchor = 'e'
-                else:
-                    bg_color = self.colors['light']
-                    fg_color = self.colors['dark']
-                    anchor = 'w'
-                
-                # Создаем фрейм сообщения
-                message_frame = tk.Frame(messages_container, bg='white')
-                message_frame.pack(fill='x', padx=10, pady=5, anchor=anchor)
-                
-                inner_frame = tk.Frame(message_frame, bg=bg_color, relief='raised', bd=1)
-                inner_frame.pack()
-                
-                header_frame = tk.Frame(inner_frame, bg=bg_color)
-                header_frame.pack(fill='x', padx=10, pady=(5, 0))
-                
-                tk.Label(header_frame, text=avatar, font=('Arial', 12),
-                        bg=bg_color, fg=fg_color).pack(side='left')
-                
-                tk.Label(header_frame, text=username, font=('Arial', 10, 'bold'),
-                        bg=bg_color, fg=fg_color).pack(side='left', padx=5)
-                
-                time_str = created_at.split()[1][:5] if ' ' in created_at else created_at[:5]
-                tk.Label(header_frame, text=time_str,
-                        font=('Arial', 9), bg=bg_color, fg=fg_color).pack(side='right')
-                
-                tk.Label(inner_frame, text=message, font=('Arial', 11),
-                        bg=bg_color, fg=fg_color, wraplength=400).pack(padx=10, pady=5)
+                self.render_chat_message(messages_container, msg)
+            self.chat_state.update(oldest_id=messages[-1][0], newest_id=messages[0][0],
+                                   has_more=len(messages) == MESSAGES_PAGE_SIZE)
+            messages_canvas.update_idletasks()
+            messages_canvas.configure(scrollregion=messages_canvas.bbox('all'))
+            messages_canvas.yview_moveto(1.0)
         else:
-            tk.Label(messages_container,
+            self.chat_state['placeholder'] = tk.Label(messages_container,
                     text="В чате пока нет сообщений",
                     font=('Arial', 12), bg='white',
-                    fg=self.colors['gray']).pack(pady=20)
+                    fg=self.colors['gray'])
+            self.chat_state['placeholder'].pack(pady=20)
+        self.chat_state['loading'] = False
+        
+        # Новые сообщения других участников дописываются опросом
+        self.chat_state['poll'] = self.root.after(CHAT_POLL_MS, self.poll_chat)
         
         # Панель ввода сообщения
         input_frame = tk.Frame(self.chat_panel, bg=self.colors['light'])
@@ -976,6 +745,82 @@ class StudentCollabApp:
                  bg=self.colors['primary'], fg='white',
                  command=lambda: self.send_chat_message(project_id, message_entry)).pack(side='right', padx=5, pady=5)
     
+    def render_chat_message(self, container, msg, before=None):
+        """Виджет одного сообщения чата (before — вставить перед этим виджетом)"""
+        msg_id, project_id, user_id, message, created_at, username, avatar = msg
+        
+        if user_id == self.current_user_id:
+            bg_color = self.colors['primary_light']
+            fg_color = 'white'
+            anchor = 'e'
+        else:
+            bg_color = self.colors['light']
+            fg_color = self.colors['dark']
+            anchor = 'w'
+        
+        # Создаем фрейм сообщения
+        message_frame = tk.Frame(container, bg='white')
+        message_frame.pack(fill='x', padx=10, pady=5, anchor=anchor, before=before)
+        
+        inner_frame = tk.Frame(message_frame, bg=bg_color, relief='raised', bd=1)
+        inner_frame.pack()
+        
+        header_frame = tk.Frame(inner_frame, bg=bg_color)
+        header_frame.pack(fill='x', padx=10, pady=(5, 0))
+        
+        tk.Label(header_frame, text=avatar, font=('Arial', 12),
+                bg=bg_color, fg=fg_color).pack(side='left')
+        
+        tk.Label(header_frame, text=username, font=('Arial', 10, 'bold'),
+                bg=bg_color, fg=fg_color).pack(side='left', padx=5)
+        
+        time_str = created_at.split()[1][:5] if ' ' in created_at else created_at[:5]
+        tk.Label(header_frame, text=time_str,
+                font=('Arial', 9), bg=bg_color, fg=fg_color).pack(side='right')
+        
+        tk.Label(inner_frame, text=message, font=('Arial', 11),
+                bg=bg_color, fg=fg_color, wraplength=400).pack(padx=10, pady=5)
+        return message_frame
+    
+    def on_chat_scroll(self, first, last):
+        """Прокрутка чата: у верхнего края подгружаем более старые сообщения"""
+        state = self.chat_state
+        state['scrollbar'].set(first, last)
+        if float(first) <= 0 and state['has_more'] and not state['loading']:
+            state['loading'] = True
+            self.root.after_idle(self.load_older_messages)
+    
+    def on_chat_wheel(self, event):
+        """Колесо мыши над чатом прокручивает сообщения"""
+        canvas = self.chat_state['canvas'] if self.chat_state else None
+        if canvas is None or not canvas.winfo_exists() or not (str(event.widget) + '.').startswith(str(canvas) + '.'):
+            return
+        canvas.yview_scroll(-1 if event.num == 4 or event.delta > 0 else 1, 'units')
+    
+    def load_older_messages(self):
+        """Вставить над историей страницу сообщений старше самого старого показанного"""
+        state = self.chat_state
+        container = state['container']
+        if not container.winfo_exists():
+            return
+        
+        messages = self.db.get_project_messages(state['project_id'], before_id=state['oldest_id'])
+        state['has_more'] = len(messages) == MESSAGES_PAGE_SIZE
+        if messages:
+            canvas = state['canvas']
+            old_height = container.winfo_height()
+            first = container.winfo_children()[0]
+            for msg in messages:
+                first = self.render_chat_message(container, msg, before=first)
+            state['oldest_id'] = messages[-1][0]
+            
+            # Сохраняем положение: на экране остаются те же сообщения
+            canvas.update_idletasks()
+            canvas.configure(scrollregion=canvas.bbox('all'))
+            new_height = container.winfo_height()
+            canvas.yview_moveto((new_height - old_height) / new_height)
+        state['loading'] = False
+    
     def send_chat_message(self, project_id, message_entry):
         """Отправляет сообщение в чат"""
         if not self.current_user_id:
@@ -991,12 +836,43 @@ class StudentCollabApp:
         
         if success:
             message_entry.delete(0, tk.END)
-            # Перезагружаем чат с текущим проектом
-            projects = self.db.get_user_projects(self.current_user_id)
-            for project in projects:
-                if project[0] == project_id:
-                    self.load_project_chat(project_id, project[1])
-                    break
+            # Дописываем только новые сообщения, включая свое
+            self.append_new_messages(scroll=True)
+    
+    def append_new_messages(self, scroll=False):
+        """Дописать в открытый чат сообщения после последнего показанного"""
+        state = self.chat_state
+        if not state or not state['container'].winfo_exists():
+            return
+        
+        messages = self.db.get_messages_since(state['project_id'], state['newest_id'] or 0)
+        if not messages:
+            return
+        
+        canvas = state['canvas']
+        # Прокручиваем вниз, только если пользователь и так смотрел в конец
+        scroll = scroll or canvas.yview()[1] >= 0.999
+        if state['placeholder'] is not None:
+            state['placeholder'].destroy()
+            state['placeholder'] = None
+        for msg in messages:
+            self.render_chat_message(state['container'], msg)
+        state['newest_id'] = messages[-1][0]
+        if state['oldest_id'] is None:
+            state['oldest_id'] = messages[0][0]
+        
+        canvas.update_idletasks()
+        canvas.configure(scrollregion=canvas.bbox('all'))
+        if scroll:
+            canvas.yview_moveto(1.0)
+    
+    def poll_chat(self):
+        """Периодически проверять новые сообщения, пока чат открыт"""
+        state = self.chat_state
+        if not state or not state['container'].winfo_exists():
+            return
+        self.append_new_messages()
+        state['poll'] = self.root.after(CHAT_POLL_MS, self.poll_chat)
     
     def create_my_tab(self):
         tab = tk.Frame(self.notebook)
@@ -1186,8 +1062,9 @@ class StudentCollabApp:
             return
         
         # Проверяем, существует ли проект
-        self.db.cursor.execute('SELECT id FROM projects WHERE id = ?', (project_id,))
-        if not self.db.cursor.fetchone():
+        cursor = self.db.get_connection().cursor()
+        cursor.execute('SELECT id FROM projects WHERE id = ?', (project_id,))
+        if not cursor.fetchone():
             messagebox.showerror("Ошибка", "Проект не найден!")
             return
         
@@ -1219,6 +1096,8 @@ class StudentCollabApp:
     
     def run(self):
         self.root.mainloop()
+        self.auth_pool.shutdown(wait=False, cancel_futures=True)
+        self.db.close()
 
 if __name__ == "__main__":
     app = StudentCollabApp()
@@ -0,0 +1,34 @@
+# storage/__init__.py
+"""Слой данных без GUI: классы хранилищ и вспомогательные функции.
+
+Подмодули импортируются лениво, при первом обращении к имени, поэтому
+`from storage import Database` не загружает PyQt6, tkinter и лишние модули —
+его можно использовать в cron-задачах и фоновых обработчиках без дисплея.
+"""
+import importlib
+
+# Имя -> модуль, в котором оно определено
+_EXPORTS = {
+    'Database': 'storage.collabmatch',
+    'CachedDatabase': 'storage.collabmatch',
+    'EnhancedDatabase': 'storage.student_collab',
+    'RemoteDatabase': 'storage.remote_database',
+    'ConnectionPool': 'storage.db_pool',
+    'export_table': 'storage.exporter',
+    'import_file': 'storage.importer',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'storage' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
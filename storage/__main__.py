@@ -0,0 +1,195 @@
+# storage/__main__.py
+"""Командная строка для collabmatch.db без GUI.
+
+    python -m storage --db collabmatch.db matches 1 2 3 --limit 10
+    python -m storage --db collabmatch.db matches --all > matches.jsonl
+    python -m storage --db collabmatch.db search "Python"
+    python -m storage --db collabmatch.db stats
+    python -m storage --db collabmatch.db import users.csv --kind users
+    python -m storage --db collabmatch.db export projects projects.parquet --since 1200
+    python -m storage --db collabmatch.db maintenance --analyze --vacuum
+
+Результат печатается в JSON; matches печатает по одной JSON-строке на пользователя.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+
+MAINTENANCE_ACTIONS = ('integrity', 'rebuild_stats', 'rebuild_index', 'rebuild_scores', 'analyze', 'vacuum',
+                       'checkpoint')
+
+
+def json_default(value):
+    """Преобразование для json.dumps: строки sqlite3.Row, множества, байты"""
+    if isinstance(value, sqlite3.Row):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def dump(value, out, indent=None):
+    out.write(json.dumps(value, ensure_ascii=False, indent=indent, default=json_default) + '\n')
+
+
+def cmd_matches(db, args, out):
+    user_ids = (row['id'] for row in db.iter_users()) if args.all else args.user_ids
+    for user_id in user_ids:
+        dump({
+            'user_id': user_id,
+            'count': db.count_matches(user_id),
+            'matches': db.find_matches(user_id, limit=args.limit, offset=args.offset),
+        }, out)
+    return 0
+
+
+def cmd_search(db, args, out):
+    search = db.search_substring if args.substring else db.search
+    dump(search(args.query, limit=args.limit, offset=args.offset), out, args.indent)
+    return 0
+
+
+def cmd_stats(db, args, out):
+    dump(db.get_stats(), out, args.indent)
+    return 0
+
+
+def cmd_import(db, args, out):
+    from storage.importer import import_file
+
+    report = import_file(db, args.path, args.kind, fmt=args.format, chunk_size=args.chunk_size)
+    dump({'imported': report['imported'], 'errors': report['errors']}, out, args.indent)
+    return 1 if report['errors'] and args.strict else 0
+
+
+def cmd_export(db, args, out):
+    from storage.exporter import export_table
+
+    dump(export_table(db, args.table, args.path, fmt=args.format, since=args.since, chunk_size=args.chunk_size),
+         out, args.indent)
+    return 0
+
+
+def cmd_maintenance(db, args, out):
+    from storage.search_index import FTS_INDEXES, TRIGRAM_INDEXES, rebuild_fts_index
+    from storage.stats import rebuild_stats
+
+    actions = [action for action in MAINTENANCE_ACTIONS if getattr(args, action)] or ['integrity', 'analyze']
+    conn = db.get_connection()
+    report = {}
+    status = 0
+    for action in actions:
+        if action == 'integrity':
+            problems = [row[0] for row in conn.execute("PRAGMA quick_check")]
+            report[action] = problems
+            if problems != ['ok']:
+                status = 1
+        elif action == 'rebuild_stats':
+            with conn:
+                rebuild_stats(conn.cursor())
+            report[action] = db.get_stats()
+        elif action == 'rebuild_index':
+            existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            rebuilt = [name for name in list(FTS_INDEXES) + list(TRIGRAM_INDEXES) if name in existing]
+            with conn:
+                for name in rebuilt:
+                    rebuild_fts_index(conn.cursor(), name)
+            report[action] = rebuilt
+        elif action == 'rebuild_scores':
+            db.rebuild_match_scores()
+            report[action] = conn.execute("SELECT COUNT(*) FROM match_scores").fetchone()[0]
+        elif action == 'analyze':
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+            report[action] = 'ok'
+        elif action == 'vacuum':
+            conn.execute("VACUUM")
+            report[action] = 'ok'
+        elif action == 'checkpoint':
+            report[action] = list(conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+    dump(report, out, args.indent)
+    return status
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m storage', description="Пакетные операции над collabmatch.db")
+    parser.add_argument('--db', default='collabmatch.db', help="путь к базе (по умолчанию collabmatch.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Общие параметры вывода принимаются после любой подкоманды
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output', help="файл для результата (по умолчанию stdout)")
+    common.add_argument('--indent', type=int, help="отступ JSON (по умолчанию одной строкой)")
+
+    matches = commands.add_parser('matches', parents=[common],
+                                  help="совпадения для пользователей (JSON-строка на пользователя)")
+    matches.add_argument('user_ids', type=int, nargs='*', help="id пользователей")
+    matches.add_argument('--all', action='store_true', help="для всех пользователей")
+    matches.add_argument('--limit', type=int, default=15, help="совпадений на пользователя")
+    matches.add_argument('--offset', type=int, default=0)
+    matches.set_defaults(handler=cmd_matches)
+
+    search = commands.add_parser('search', parents=[common],
+                                 help="поиск по пользователям, мероприятиям и проектам")
+    search.add_argument('query')
+    search.add_argument('--substring', action='store_true', help="поиск подстроки вместо полнотекстового")
+    search.add_argument('--limit', type=int)
+    search.add_argument('--offset', type=int, default=0)
+    search.set_defaults(handler=cmd_search)
+
+    stats = commands.add_parser('stats', parents=[common], help="счетчики статистики")
+    stats.set_defaults(handler=cmd_stats)
+
+    load = commands.add_parser('import', parents=[common], help="импорт из CSV или JSONL")
+    load.add_argument('path')
+    load.add_argument('--kind', required=True, choices=['users', 'events', 'projects'])
+    load.add_argument('--format', choices=['csv', 'jsonl'], help="по умолчанию по расширению файла")
+    load.add_argument('--chunk-size', type=int, default=1000)
+    load.add_argument('--strict', action='store_true', help="код возврата 1, если есть ошибочные строки")
+    load.set_defaults(handler=cmd_import)
+
+    export = commands.add_parser('export', parents=[common], help="выгрузка в JSONL, CSV или Parquet")
+    export.add_argument('table', choices=['users', 'events', 'projects'])
+    export.add_argument('path')
+    export.add_argument('--format', choices=['jsonl', 'csv', 'parquet'], help="по умолчанию по расширению файла")
+    export.add_argument('--since', type=int,
+                        help="только строки с id больше отметки (watermark) прошлой выгрузки")
+    export.add_argument('--chunk-size', type=int, default=1000)
+    export.set_defaults(handler=cmd_export)
+
+    maintenance = commands.add_parser('maintenance', parents=[common],
+                                      help="обслуживание базы (по умолчанию --integrity --analyze)")
+    maintenance.add_argument('--integrity', action='store_true', help="PRAGMA quick_check")
+    maintenance.add_argument('--rebuild-stats', action='store_true', help="пересчитать таблицу stats")
+    maintenance.add_argument('--rebuild-index', action='store_true', help="перестроить FTS- и триграммные индексы")
+    maintenance.add_argument('--rebuild-scores', action='store_true', help="пересчитать match_scores")
+    maintenance.add_argument('--analyze', action='store_true', help="ANALYZE и PRAGMA optimize")
+    maintenance.add_argument('--vacuum', action='store_true', help="VACUUM")
+    maintenance.add_argument('--checkpoint', action='store_true', help="перенести WAL в основной файл")
+    maintenance.set_defaults(handler=cmd_maintenance)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'matches' and not (args.all or args.user_ids):
+        parser.error("укажите id пользователей или --all")
+
+    from storage import Database
+
+    db = Database(args.db)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        return args.handler(db, args, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
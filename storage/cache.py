@@ -0,0 +1,179 @@
+# storage/cache.py
+"""Кэш чтения для Database, сбрасываемый при записи.
+
+У каждой таблицы есть счетчик поколений: методы записи увеличивают его,
+а запись в кэше действительна, пока поколения ее таблиц не изменились.
+Запись другими соединениями (другой поток или процесс) видна по PRAGMA data_version
+и сбрасывает все поколения сразу; data_version проверяется не чаще раза
+в check_interval секунд на поток, чтобы попадание не стоило запроса к базе.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+# Типы значений, которые не нужно копировать
+_IMMUTABLE = frozenset({str, int, float, bool, bytes, type(None)})
+
+
+def _copy(value):
+    """Копия результата: списки, словари и кортежи копируются, строки и числа — общие"""
+    cls = type(value)
+    if cls is list:
+        return [item if type(item) in _IMMUTABLE else _copy(item) for item in value]
+    if cls is dict:
+        return {key: item if type(item) in _IMMUTABLE else _copy(item) for key, item in value.items()}
+    if cls is tuple:
+        return tuple(item if type(item) in _IMMUTABLE else _copy(item) for item in value)
+    return value
+
+
+def _cached_read(method, tables):
+    """Обернуть метод чтения: результат берется из кэша, пока не менялись tables"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            key = (method.__name__, args, tuple(sorted(kwargs.items())) if kwargs else ())
+            hash(key)
+        except TypeError:
+            # Нехешируемые аргументы — читаем мимо кэша
+            return method(self, *args, **kwargs)
+
+        self._check_external_writes()
+        with self._cache_lock:
+            generations = tuple(self._generations.get(table, 0) for table in tables)
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == generations:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return _copy(entry[1])
+            self.cache_misses += 1
+
+        value = method(self, *args, **kwargs)
+
+        with self._cache_lock:
+            self._cache[key] = (generations, _copy(value))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.cache_evictions += 1
+        return value
+    return wrapper
+
+
+def _invalidating_write(method, tables):
+    """Обернуть метод записи: после него кэш по tables устаревает"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.invalidate(*tables)
+    return wrapper
+
+
+class CachingMixin:
+    """Примесь к Database: LRU-кэш методов чтения с поколениями таблиц.
+
+    Использование: class CachedDatabase(CachingMixin, Database).
+    Результаты отдаются копиями, поэтому изменение полученных списков
+    и словарей не портит кэш.
+    """
+
+    # Метод чтения -> таблицы, от которых зависит результат
+    CACHED_READS = {
+        'get_all_users': ('users',),
+        'get_all_events': ('events',),
+        'get_all_projects': ('projects',),
+        'get_users_page': ('users',),
+        'get_events_page': ('events',),
+        'get_projects_page': ('projects',),
+        'get_user': ('users',),
+        'get_user_skills': ('users',),
+        'get_user_interests': ('users',),
+        'get_users_by_skill': ('users',),
+        'get_all_skills': ('users',),
+        'find_matches': ('users',),
+        'count_matches': ('users',),
+        'search': ('users', 'events', 'projects'),
+        'search_substring': ('users', 'events', 'projects'),
+        'get_stats': ('users', 'events', 'projects'),
+    }
+
+    # Метод записи -> таблицы, которые он меняет
+    INVALIDATES = {
+        'add_user': ('users',),
+        'add_users_bulk': ('users',),
+        'update_user': ('users',),
+        'rebuild_match_scores': ('users',),
+        'add_event': ('events',),
+        'add_events_bulk': ('events',),
+        'add_project': ('projects',),
+        'add_projects_bulk': ('projects',),
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, tables in cls.CACHED_READS.items():
+            if hasattr(cls, name):
+                setattr(cls, name, _cached_read(getattr(cls, name), tables))
+        for name, tables in cls.INVALIDATES.items():
+            if hasattr(cls, name):
+                setattr(cls, name, _invalidating_write(getattr(cls, name), tables))
+
+    def __init__(self, *args, cache_size=256, check_interval=0.05, **kwargs):
+        """
+        cache_size: наибольшее число записей в кэше
+        check_interval: как часто (в секундах) проверять запись другими процессами; 0 — при каждом чтении
+        """
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._generations = {}
+        self._data_version = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def invalidate(self, *tables):
+        """Увеличить поколения таблиц (без аргументов — всех)"""
+        with self._cache_lock:
+            if not tables:
+                tables = set(self._generations) | {t for ts in self.CACHED_READS.values() for t in ts}
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def _check_external_writes(self):
+        """Сбросить кэш, если базу изменило другое соединение"""
+        now = time.monotonic()
+        if now - getattr(self._data_version, 'checked_at', -self.check_interval) < self.check_interval:
+            return
+        self._data_version.checked_at = now
+        cursor = self.get_connection().cursor()
+        cursor.execute("PRAGMA data_version")
+        version = cursor.fetchone()[0]
+        seen = getattr(self._data_version, 'value', None)
+        if seen != version:
+            self._data_version.value = version
+            # Первое чтение в потоке: записи в кэше могли появиться до чужих изменений
+            if seen is not None or self._cache:
+                self.invalidate()
+
+    def clear_cache(self):
+        """Очистить кэш и счетчики"""
+        with self._cache_lock:
+            self._cache.clear()
+            self.cache_hits = self.cache_misses = self.cache_evictions = 0
+
+    def cache_info(self):
+        """Счетчики кэша: попадания, промахи, вытеснения, размер"""
+        with self._cache_lock:
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'evictions': self.cache_evictions,
+                'size': len(self._cache),
+                'max_size': self.cache_size,
+            }
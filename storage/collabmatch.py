@@ -0,0 +1,619 @@
+# storage/collabmatch.py
+"""Хранилище CollabMatch (collabmatch.db) без зависимостей от GUI"""
+import json
+from .cache import CachingMixin
+from .db_pool import ConnectionPool
+from .instrumentation import instrumented
+from .matching import MatchEngine, chunked
+from .migrations import DATABASE_MIGRATIONS, migrate
+from .pagination import PAGE_SIZE, keyset_page
+from .stats import create_stats, read_stats
+from .streaming import CHUNK_SIZE, decode_list, stream_rows
+from .search_index import (FTS_INDEXES, TRIGRAM_INDEXES, TRIGRAM_TOKENIZER, build_match_query,
+                          create_fts_index, fts_search, substring_search)
+
+
+# Порядок результатов поиска в каждой таблице
+SEARCH_ORDER = {'users': 'name', 'events': 'start_date', 'projects': 'created_at DESC'}
+
+
+@instrumented
+class Database:
+    def __init__(self, db_path: str = "collabmatch.db"):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path)
+        self.matcher = MatchEngine(self.get_connection)
+        # Справочник терминов name -> id: строки skill не удаляются, поэтому кэш
+        # пополняется после фиксации транзакции и не перечитывается целиком
+        self._term_ids = {}
+        self.init_database()
+
+    def get_connection(self):
+        """Получить соединение с базой данных (переиспользуется в пределах потока)"""
+        return self.pool.get()
+
+    def close(self):
+        """Закрыть все соединения с базой данных"""
+        self.pool.close_all()
+
+    def init_database(self):
+        """Инициализировать базу данных"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        # Таблица пользователей
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT,
+                skills TEXT DEFAULT '[]',
+                interests TEXT DEFAULT '[]',
+                status TEXT DEFAULT '',
+                looking_for_project INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Таблица мероприятий
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                start_date TEXT,
+                end_date TEXT,
+                location TEXT,
+                tags TEXT DEFAULT '[]',
+                max_participants INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Таблица проектов
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                status TEXT DEFAULT 'planning',
+                owner_id INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (owner_id) REFERENCES users(id)
+            )
+        ''')
+
+        # Нормализованные навыки и интересы: общий справочник терминов и таблицы связей
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_skill'")
+        needs_terms_backfill = cursor.fetchone() is None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS skill (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_skill (
+                user_id INTEGER NOT NULL,
+                skill_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, skill_id),
+                FOREIGN KEY (user_id) REFERENCES users(id),
+                FOREIGN KEY (skill_id) REFERENCES skill(id)
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_interest (
+                user_id INTEGER NOT NULL,
+                skill_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, skill_id),
+                FOREIGN KEY (user_id) REFERENCES users(id),
+                FOREIGN KEY (skill_id) REFERENCES skill(id)
+            ) WITHOUT ROWID
+        ''')
+
+        # Обратный индекс: термин -> пользователи
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_skill_skill ON user_skill (skill_id, user_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_interest_skill ON user_interest (skill_id, user_id)")
+
+        # Материализованные баллы совпадений (см. MatchScore в models.py);
+        # заполняет их миграция 2 — и для новой базы, и при обновлении старой
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS match_scores (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user1_id INTEGER NOT NULL,
+                user2_id INTEGER NOT NULL,
+                skill_match INTEGER DEFAULT 0,
+                interest_match INTEGER DEFAULT 0,
+                event_match INTEGER DEFAULT 0,
+                project_match INTEGER DEFAULT 0,
+                total_score INTEGER DEFAULT 0,
+                match_reason TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (user1_id, user2_id),
+                FOREIGN KEY (user1_id) REFERENCES users(id),
+                FOREIGN KEY (user2_id) REFERENCES users(id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_match_scores_rank
+            ON match_scores (user1_id, total_score DESC, user2_id)
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_match_scores_user2 ON match_scores (user2_id)")
+
+        # Полнотекстовые индексы для search(), синхронизируются триггерами
+        for fts_table, (table, columns, _) in FTS_INDEXES.items():
+            create_fts_index(cursor, fts_table, table, columns)
+
+        # Триграммные индексы для поиска подстроки (search_substring)
+        for trgm_table, (table, columns) in TRIGRAM_INDEXES.items():
+            create_fts_index(cursor, trgm_table, table, columns, tokenize=TRIGRAM_TOKENIZER)
+
+        # Тестовые данные
+        cursor.execute("SELECT COUNT(*) FROM users")
+        if cursor.fetchone()[0] == 0:
+            # Тестовые пользователи
+            test_users = [
+                ('Иван Программист', 'ivan@example.com',
+                 '["Python", "SQL", "AI", "Flask"]', '["биология", "нейросети", "машинное обучение"]',
+                 'Хочу сотрудничать с биологами', 1),
+                ('Мария Биолог', 'maria@example.com',
+                 '["биоинформатика", "статистика", "R"]', '["нейросети", "генетика", "Python"]',
+                 'Ищу программиста для проекта', 1),
+                ('Алексей Дизайнер', 'alex@example.com',
+                 '["UI/UX", "Figma", "Photoshop"]', '["стартапы", "веб-разработка", "IT"]',
+                 'Открыт к коллаборациям', 1),
+                ('Ольга Маркетолог', 'olga@example.com',
+                 '["SMM", "Аналитика", "Копирайтинг"]', '["образование", "социальные проекты", "менеджмент"]',
+                 'Готова помочь с продвижением', 0),
+                ('Сергей Инженер', 'sergey@example.com',
+                 '["Arduino", "электроника", "C++"]', '["робототехника", "IoT", "программирование"]',
+                 'Ищу команду для хакатона', 1)
+            ]
+
+            for user in test_users:
+                cursor.execute('''
+                    INSERT INTO users (name, email, skills, interests, status, looking_for_project)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', user)
+
+            # Тестовые мероприятия
+            test_events = [
+                ('Нейросети в биологии',
+                 'Лекция о применении нейросетей в биологических исследованиях',
+                 '2024-12-15 18:00', '2024-12-15 20:00',
+                 'Аудитория 101', '["нейросети", "биология", "исследования"]', 50),
+                ('Стартап-уикенд',
+                 'Интенсив по созданию междисциплинарных проектов',
+                 '2024-12-20 10:00', '2024-12-21 18:00',
+                 'Коворкинг "Точка кипения"', '["стартап", "проекты", "коллаборации"]', 100),
+                ('Хакатон по биоинформатике',
+                 'Соревнование по созданию IT-решений для биологии',
+                 '2024-12-25 09:00', '2024-12-27 21:00',
+                 'Технопарк', '["хакатон", "биоинформатика", "программирование"]', 30)
+            ]
+
+            for event in test_events:
+                cursor.execute('''
+                    INSERT INTO events (title, description, start_date, end_date, location, tags, max_participants)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', event)
+
+            # Тестовые проекты
+            test_projects = [
+                ('AI для анализа ДНК', 'Проект по созданию нейросети для анализа генетических данных', 'active', 1),
+                ('EdTech платформа', 'Образовательная платформа для студентов', 'planning', 3),
+                ('Робот-помощник', 'Автоматизация лабораторных работ', 'in_progress', 5)
+            ]
+
+            for project in test_projects:
+                cursor.execute('''
+                    INSERT INTO projects (title, description, status, owner_id)
+                    VALUES (?, ?, ?, ?)
+                ''', project)
+
+        # Перенос навыков и интересов из JSON-колонок в таблицы связей
+        if needs_terms_backfill:
+            self._backfill_user_terms(cursor)
+
+        # Счетчики статистики, поддерживаются триггерами (см. stats.py)
+        create_stats(cursor)
+
+        conn.commit()
+
+        # Индексы и дальнейшие изменения схемы — версионными миграциями
+        migrate(conn, DATABASE_MIGRATIONS)
+
+    def _backfill_user_terms(self, cursor):
+        """Заполнить таблицы связей навыков/интересов по JSON-колонкам users"""
+        cursor.execute("SELECT id, skills, interests FROM users")
+        rows = [(row[0], json.loads(row[1] or '[]'), json.loads(row[2] or '[]')) for row in cursor.fetchall()]
+        self._link_user_terms(cursor, rows)
+
+    def _link_user_terms(self, cursor, rows):
+        """Добавить связи для строк (user_id, skills, interests) пакетно.
+
+        Возвращает {name: id} терминов, которых не было в self._term_ids; вызывающий
+        код добавляет их в кэш после фиксации транзакции.
+        """
+        names = set()
+        for _, skills, interests in rows:
+            names.update(skills)
+            names.update(interests)
+        missing = names - self._term_ids.keys()
+        cursor.executemany("INSERT OR IGNORE INTO skill (name) VALUES (?)", [(name,) for name in missing])
+
+        found = {}
+        for chunk in chunked(missing):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f"SELECT id, name FROM skill WHERE name IN ({placeholders})", chunk)
+            found.update((row[1], row[0]) for row in cursor.fetchall())
+        term_ids = dict(self._term_ids)
+        term_ids.update(found)
+
+        user_skills = {(user_id, term_ids[name]) for user_id, skills, _ in rows for name in skills}
+        user_interests = {(user_id, term_ids[name]) for user_id, _, interests in rows for name in interests}
+        cursor.executemany("INSERT OR IGNORE INTO user_skill (user_id, skill_id) VALUES (?, ?)", user_skills)
+        cursor.executemany("INSERT OR IGNORE INTO user_interest (user_id, skill_id) VALUES (?, ?)", user_interests)
+        return found
+
+    def _get_term_ids(self, cursor, names):
+        """Получить id терминов справочника, добавив отсутствующие"""
+        term_ids = []
+        for name in dict.fromkeys(names):
+            cursor.execute("INSERT OR IGNORE INTO skill (name) VALUES (?)", (name,))
+            cursor.execute("SELECT id FROM skill WHERE name = ?", (name,))
+            term_ids.append(cursor.fetchone()[0])
+        return term_ids
+
+    def _sync_user_terms(self, cursor, user_id, skills=None, interests=None):
+        """Синхронизировать таблицы связей с новыми навыками/интересами пользователя"""
+        if skills is not None:
+            cursor.execute("DELETE FROM user_skill WHERE user_id = ?", (user_id,))
+            cursor.executemany("INSERT INTO user_skill (user_id, skill_id) VALUES (?, ?)",
+                               [(user_id, term_id) for term_id in self._get_term_ids(cursor, skills)])
+        if interests is not None:
+            cursor.execute("DELETE FROM user_interest WHERE user_id = ?", (user_id,))
+            cursor.executemany("INSERT INTO user_interest (user_id, skill_id) VALUES (?, ?)",
+                               [(user_id, term_id) for term_id in self._get_term_ids(cursor, interests)])
+
+    def get_all_users(self):
+        """Получить всех пользователей"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM users ORDER BY name")
+        users = [dict(row) for row in cursor.fetchall()]
+        return users
+
+    def get_all_events(self):
+        """Получить все мероприятия"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM events ORDER BY start_date")
+        events = [dict(row) for row in cursor.fetchall()]
+        return events
+
+    def get_all_projects(self):
+        """Получить все проекты"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM projects ORDER BY created_at DESC")
+        projects = [dict(row) for row in cursor.fetchall()]
+        return projects
+
+    def _iter_table(self, table, list_columns, chunk_size):
+        """Потоково читать таблицу в порядке id на отдельном соединении одним снимком"""
+        for row in stream_rows(self.pool.connect(), f"SELECT * FROM {table} ORDER BY id", chunk_size=chunk_size):
+            row = dict(row)
+            for column in list_columns:
+                row[column] = set(decode_list(row[column]))
+            yield row
+
+    def iter_users(self, chunk_size=CHUNK_SIZE, parse_skills=False):
+        """Генератор всех пользователей (dict); parse_skills — skills/interests как множества"""
+        return self._iter_table('users', ('skills', 'interests') if parse_skills else (), chunk_size)
+
+    def iter_events(self, chunk_size=CHUNK_SIZE, parse_skills=False):
+        """Генератор всех мероприятий (dict); parse_skills — tags как множество"""
+        return self._iter_table('events', ('tags',) if parse_skills else (), chunk_size)
+
+    def iter_projects(self, chunk_size=CHUNK_SIZE):
+        """Генератор всех проектов (dict)"""
+        return self._iter_table('projects', (), chunk_size)
+
+    def _get_page(self, table, column, descending, after, page_size):
+        """Страница строк по ключу сортировки: (список dict, курсор следующей страницы)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        rows, next_cursor = keyset_page(cursor, table, column, descending, after, page_size)
+        return [dict(row) for row in rows], next_cursor
+
+    def get_users_page(self, after=None, page_size=PAGE_SIZE):
+        """Страница пользователей по имени; after — курсор (name, id) из предыдущей страницы"""
+        return self._get_page('users', 'name', False, after, page_size)
+
+    def get_events_page(self, after=None, page_size=PAGE_SIZE):
+        """Страница мероприятий по дате начала; after — курсор (start_date, id)"""
+        return self._get_page('events', 'start_date', False, after, page_size)
+
+    def get_projects_page(self, after=None, page_size=PAGE_SIZE):
+        """Страница проектов, новые первыми; after — курсор (created_at, id)"""
+        return self._get_page('projects', 'created_at', True, after, page_size)
+
+    def get_user(self, user_id):
+        """Получить пользователя по ID"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        user = cursor.fetchone()
+        return dict(user) if user else None
+
+    def get_user_skills(self, user_id):
+        """Получить навыки пользователя из таблицы связей"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT s.name FROM user_skill us
+            JOIN skill s ON s.id = us.skill_id
+            WHERE us.user_id = ?
+            ORDER BY s.name
+        ''', (user_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_user_interests(self, user_id):
+        """Получить интересы пользователя из таблицы связей"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT s.name FROM user_interest ui
+            JOIN skill s ON s.id = ui.skill_id
+            WHERE ui.user_id = ?
+            ORDER BY s.name
+        ''', (user_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def get_users_by_skill(self, skill):
+        """Получить пользователей с указанным навыком (по индексу)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT u.* FROM skill s
+            JOIN user_skill us ON us.skill_id = s.id
+            JOIN users u ON u.id = us.user_id
+            WHERE s.name = ?
+            ORDER BY u.name
+        ''', (skill,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_all_skills(self):
+        """Получить все навыки, указанные хотя бы у одного пользователя"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT name FROM skill
+            WHERE id IN (SELECT skill_id FROM user_skill)
+            ORDER BY name
+        ''')
+        return [row[0] for row in cursor.fetchall()]
+
+    def add_user(self, name, email, skills, interests, collaboration_status, looking_for_project):
+        """Добавить нового пользователя"""
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO users (name, email, skills, interests, status, looking_for_project)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (name, email, json.dumps(skills, ensure_ascii=False), json.dumps(interests, ensure_ascii=False),
+                  collaboration_status, looking_for_project))
+            user_id = cursor.lastrowid
+            self._sync_user_terms(cursor, user_id, skills, interests)
+            self.matcher.refresh_scores(cursor, [user_id])
+        return user_id
+
+    def update_user(self, user_id, name=None, email=None, skills=None, interests=None,
+                    collaboration_status=None, looking_for_project=None):
+        """Обновить профиль пользователя"""
+        updates = []
+        params = []
+
+        if name is not None:
+            updates.append("name = ?")
+            params.append(name)
+        if email is not None:
+            updates.append("email = ?")
+            params.append(email)
+        if skills is not None:
+            updates.append("skills = ?")
+            params.append(json.dumps(skills, ensure_ascii=False))
+        if interests is not None:
+            updates.append("interests = ?")
+            params.append(json.dumps(interests, ensure_ascii=False))
+        if collaboration_status is not None:
+            updates.append("status = ?")
+            params.append(collaboration_status)
+        if looking_for_project is not None:
+            updates.append("looking_for_project = ?")
+            params.append(looking_for_project)
+
+        if not updates:
+            return False
+
+        params.append(user_id)
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute(f"UPDATE users SET {', '.join(updates)} WHERE id = ?", tuple(params))
+            if cursor.rowcount == 0:
+                return False
+            self._sync_user_terms(cursor, user_id, skills, interests)
+            if skills is not None or interests is not None or looking_for_project is not None:
+                self.matcher.refresh_scores(cursor, [user_id])
+        return True
+
+    def rebuild_match_scores(self, user_ids=None):
+        """Пересчитать баллы совпадений указанных пользователей (None — всю таблицу)"""
+        conn = self.get_connection()
+        with conn:
+            self.matcher.refresh_scores(conn.cursor(), user_ids)
+
+    def _begin_bulk_insert(self, conn, table):
+        """Начать пишущую транзакцию и вернуть максимальный id таблицы до вставки"""
+        conn.execute("BEGIN IMMEDIATE")
+        return conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+
+    def _inserted_ids(self, cursor, table, last_id):
+        """id строк, вставленных в текущей транзакции после last_id"""
+        cursor.execute(f"SELECT id FROM {table} WHERE id > ? ORDER BY id", (last_id,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def add_users_bulk(self, users, refresh_scores=True):
+        """Добавить пользователей одной транзакцией.
+
+        users: последовательность кортежей в порядке аргументов add_user
+        (name, email, skills, interests, collaboration_status, looking_for_project).
+        Баллы совпадений пересчитываются отдельной транзакцией после вставки;
+        refresh_scores=False — не пересчитывать (при загрузке несколькими пакетами
+        вызывающий код потом делает rebuild_match_scores(ids) один раз).
+        Возвращает список id новых пользователей.
+        """
+        users = list(users)
+        if not users:
+            return []
+
+        conn = self.get_connection()
+        with conn:
+            last_id = self._begin_bulk_insert(conn, 'users')
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO users (name, email, skills, interests, status, looking_for_project)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(name, email, json.dumps(skills, ensure_ascii=False), json.dumps(interests, ensure_ascii=False),
+                   status, looking) for name, email, skills, interests, status, looking in users])
+            user_ids = self._inserted_ids(cursor, 'users', last_id)
+            new_terms = self._link_user_terms(cursor, [(user_id, user[2], user[3])
+                                                       for user_id, user in zip(user_ids, users)])
+        self._term_ids.update(new_terms)
+        if refresh_scores:
+            self.rebuild_match_scores(user_ids)
+        return user_ids
+
+    def add_events_bulk(self, events):
+        """Добавить мероприятия одной транзакцией.
+
+        events: кортежи (title, description, start_date, end_date, location, tags, max_participants).
+        Возвращает список id новых мероприятий.
+        """
+        events = list(events)
+        if not events:
+            return []
+
+        conn = self.get_connection()
+        with conn:
+            last_id = self._begin_bulk_insert(conn, 'events')
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO events (title, description, start_date, end_date, location, tags, max_participants)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(title, description, start_date, end_date, location, json.dumps(tags, ensure_ascii=False),
+                   max_participants)
+                  for title, description, start_date, end_date, location, tags, max_participants in events])
+            event_ids = self._inserted_ids(cursor, 'events', last_id)
+        return event_ids
+
+    def add_projects_bulk(self, projects):
+        """Добавить проекты одной транзакцией.
+
+        projects: кортежи (title, description, status, owner_id).
+        Возвращает список id новых проектов.
+        """
+        projects = list(projects)
+        if not projects:
+            return []
+
+        conn = self.get_connection()
+        with conn:
+            last_id = self._begin_bulk_insert(conn, 'projects')
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO projects (title, description, status, owner_id)
+                VALUES (?, ?, ?, ?)
+            ''', projects)
+            project_ids = self._inserted_ids(cursor, 'projects', last_id)
+        return project_ids
+
+    def add_event(self, title, description, start_date, end_date, location, tags, max_participants):
+        """Добавить новое мероприятие"""
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO events (title, description, start_date, end_date, location, tags, max_participants)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (title, description, start_date, end_date, location, json.dumps(tags, ensure_ascii=False), max_participants))
+            event_id = cursor.lastrowid
+        return event_id
+
+    def add_project(self, title, description, status, owner_id):
+        """Добавить новый проект"""
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO projects (title, description, status, owner_id)
+                VALUES (?, ?, ?, ?)
+            ''', (title, description, status, owner_id))
+            project_id = cursor.lastrowid
+        return project_id
+
+    def find_matches(self, user_id, limit=None, offset=0):
+        """Найти совпадения для пользователя (лучшие limit штук, начиная с offset)"""
+        if limit is not None and offset + limit <= self.matcher.top_k:
+            return self.matcher.read_matches(user_id, limit, offset)
+        # В match_scores только первые top_k совпадений, дальше считаем на лету
+        return self.matcher.find_matches(user_id, limit, offset)
+
+    def count_matches(self, user_id):
+        """Количество совпадений для пользователя"""
+        return self.matcher.count_matches(user_id)
+
+    def search(self, query, limit=None, offset=0):
+        """Полнотекстовый поиск по всем данным (по релевантности BM25, постранично)"""
+        results = {'users': [], 'events': [], 'projects': []}
+        match = build_match_query(query)
+        if match is None:
+            return results
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        for fts_table, (table, _, weights) in FTS_INDEXES.items():
+            rows = fts_search(cursor, fts_table, table, weights, match, 't.' + SEARCH_ORDER[table], limit, offset)
+            results[table] = [dict(row) for row in rows]
+
+        return results
+
+    def search_substring(self, query, limit=None, offset=0):
+        """Поиск подстроки по всем данным: те же строки и порядок, что у LIKE '%query%'"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        results = {}
+
+        for trgm_table, (table, columns) in TRIGRAM_INDEXES.items():
+            rows = substring_search(cursor, trgm_table, table, columns, query, SEARCH_ORDER[table], limit, offset)
+            results[table] = [dict(row) for row in rows]
+
+        return results
+
+    def get_stats(self):
+        """Получить статистику (одна строка счетчиков из таблицы stats)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        return read_stats(cursor)
+
+
+class CachedDatabase(CachingMixin, Database):
+    """Database с кэшем чтения, сбрасываемым при записи (см. cache.py)"""
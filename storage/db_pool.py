@@ -0,0 +1,67 @@
+# storage/db_pool.py
+import sqlite3
+import threading
+
+from .instrumentation import connection_factory
+
+
+class ConnectionPool:
+    """Пул соединений SQLite: одно переиспользуемое соединение на поток"""
+
+    # Настройки, применяемые к каждому новому соединению
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -16000",      # ~16 МБ страничного кэша
+        "PRAGMA mmap_size = 268435456",    # 256 МБ memory-mapped I/O
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    def __init__(self, db_path, row_factory=sqlite3.Row, cached_statements=256):
+        """
+        db_path: путь к файлу базы данных
+        row_factory: фабрика строк для всех соединений пула
+        cached_statements: размер кэша подготовленных выражений на соединение
+        """
+        self.db_path = db_path
+        self.row_factory = row_factory
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connect(self):
+        """Открыть новое настроенное соединение (не закрепленное за потоком)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            factory=connection_factory()
+        )
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def get(self):
+        """Получить соединение текущего потока, создав его при первом обращении"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        """Закрыть все соединения пула"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
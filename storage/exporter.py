@@ -0,0 +1,171 @@
+# storage/exporter.py
+import csv
+import json
+import os
+
+from .streaming import CHUNK_SIZE, decode_list, stream_chunks
+
+
+# Выгружаемые таблицы: имя -> (JSON-колонки со списками, целочисленные колонки)
+EXPORTS = {
+    'users': (('skills', 'interests'), ('id', 'looking_for_project')),
+    'events': (('tags',), ('id', 'max_participants')),
+    'projects': ((), ('id', 'owner_id')),
+}
+
+
+def _import_pyarrow():
+    """Импортировать pyarrow с понятной ошибкой при его отсутствии"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Для выгрузки в Parquet нужен pyarrow: pip install pyarrow") from e
+    return pa, pq
+
+
+def detect_format(path):
+    """Определить формат выгрузки по расширению"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if ext == '.parquet':
+        return 'parquet'
+    raise ValueError(f"Неизвестный формат файла: {path} (ожидается .csv, .jsonl или .parquet)")
+
+
+def table_columns(conn, table):
+    """Имена колонок таблицы в порядке схемы"""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def iter_chunks(conn, table, since=None, chunk_size=CHUNK_SIZE):
+    """Читать таблицу пачками по chunk_size строк в порядке id.
+
+    conn — отдельное соединение, которое закрывается по окончании чтения;
+    все пачки берутся из одного снимка базы (см. streaming.stream_chunks).
+    JSON-колонки со списками разбираются один раз, каждая строка — dict.
+    since — отметка прошлой выгрузки (наибольший выгруженный id): выбираются
+    только строки с id больше нее. created_at для отметки не подходит: у него
+    точность в секунду, и строки, добавленные в ту же секунду, терялись бы.
+    """
+    if table not in EXPORTS:
+        raise ValueError(f"Неизвестная таблица: {table}")
+    list_columns = EXPORTS[table][0]
+
+    if since is None:
+        sql, params = f"SELECT * FROM {table} ORDER BY id", ()
+    else:
+        sql, params = f"SELECT * FROM {table} WHERE id > ? ORDER BY id", (since,)
+
+    for rows in stream_chunks(conn, sql, params, chunk_size):
+        chunk = []
+        for row in rows:
+            record = dict(row)
+            for column in list_columns:
+                record[column] = decode_list(record[column])
+            chunk.append(record)
+        yield chunk
+
+
+class JsonlWriter:
+    """Запись строк в JSON Lines"""
+
+    def __init__(self, path, table, columns):
+        self.file = open(path, 'w', encoding='utf-8', newline='\n')
+
+    def write(self, chunk):
+        self.file.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in chunk)
+
+    def close(self):
+        self.file.close()
+
+
+class CsvWriter:
+    """Запись строк в CSV; списки пишутся JSON-массивом, как их читает importer"""
+
+    def __init__(self, path, table, columns):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.list_columns = EXPORTS[table][0]
+        self.writer = csv.DictWriter(self.file, fieldnames=columns)
+        self.writer.writeheader()
+
+    def write(self, chunk):
+        for record in chunk:
+            for column in self.list_columns:
+                record[column] = json.dumps(record[column], ensure_ascii=False)
+            self.writer.writerow(record)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Запись строк в Parquet: каждая пачка — отдельная группа строк"""
+
+    def __init__(self, path, table, columns):
+        self.pa, self.pq = _import_pyarrow()
+        self.columns = columns
+        self.list_columns, self.int_columns = EXPORTS[table]
+        self.schema = self.pa.schema([(column, self._field_type(column)) for column in columns])
+        self.writer = self.pq.ParquetWriter(path, self.schema)
+
+    def _field_type(self, column):
+        pa = self.pa
+        if column in self.list_columns:
+            return pa.list_(pa.string())
+        if column in self.int_columns:
+            return pa.int64()
+        return pa.string()
+
+    def write(self, chunk):
+        data = {}
+        for column in self.columns:
+            values = [record[column] for record in chunk]
+            if column in self.list_columns:
+                values = [[str(item) for item in value] for value in values]
+            elif column not in self.int_columns:
+                values = [None if value is None else str(value) for value in values]
+            data[column] = values
+        self.writer.write_table(self.pa.Table.from_pydict(data, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    'jsonl': JsonlWriter,
+    'csv': CsvWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def export_table(db, table, path, fmt=None, since=None, chunk_size=CHUNK_SIZE):
+    """Выгрузить таблицу users/events/projects в JSONL, CSV или Parquet.
+
+    Строки читаются курсором пачками, поэтому память не растет с размером таблицы.
+    Возвращает {'rows': N, 'watermark': наибольший выгруженный id} — отметку
+    можно передать в since при следующей выгрузке, чтобы получить только новые строки.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+
+    if table not in EXPORTS:
+        raise ValueError(f"Неизвестная таблица: {table}")
+
+    report = {'rows': 0, 'watermark': since}
+    writer = WRITERS[fmt](path, table, table_columns(db.get_connection(), table))
+    try:
+        for chunk in iter_chunks(db.pool.connect(), table, since, chunk_size):
+            # Пачки идут в порядке id, последняя строка пачки — наибольший id
+            report['watermark'] = chunk[-1]['id']
+            writer.write(chunk)
+            report['rows'] += len(chunk)
+    finally:
+        writer.close()
+    return report
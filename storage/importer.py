@@ -0,0 +1,180 @@
+# storage/importer.py
+import csv
+import functools
+import json
+import os
+import sqlite3
+
+
+def parse_list(value):
+    """Список из JSON-массива, JSON-строки массива или строки через запятую"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    value = str(value).strip()
+    if value.startswith('['):
+        return parse_list(json.loads(value))
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_bool(value):
+    """Булево значение из 1/0, true/false, да/нет"""
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'y', 'да', '+'):
+        return True
+    if text in ('', '0', 'false', 'no', 'n', 'нет', '-'):
+        return False
+    raise ValueError(f"не удалось разобрать логическое значение: {value!r}")
+
+
+def parse_int(value, default=None):
+    """Целое число или default для пустого значения"""
+    if value is None or str(value).strip() == '':
+        return default
+    return int(value)
+
+
+def required(record, field):
+    """Обязательное непустое текстовое поле"""
+    value = record.get(field)
+    if value is None or str(value).strip() == '':
+        raise ValueError(f"не заполнено поле '{field}'")
+    return str(value).strip()
+
+
+def optional(record, field, default=''):
+    """Необязательное текстовое поле"""
+    value = record.get(field)
+    return default if value is None else str(value).strip()
+
+
+def user_row(record):
+    """Кортеж аргументов add_users_bulk из записи файла"""
+    return (
+        required(record, 'name'),
+        optional(record, 'email'),
+        parse_list(record.get('skills')),
+        parse_list(record.get('interests')),
+        optional(record, 'status', optional(record, 'collaboration_status')),
+        parse_bool(record.get('looking_for_project')),
+    )
+
+
+def event_row(record):
+    """Кортеж аргументов add_events_bulk из записи файла"""
+    return (
+        required(record, 'title'),
+        optional(record, 'description'),
+        optional(record, 'start_date'),
+        optional(record, 'end_date'),
+        optional(record, 'location'),
+        parse_list(record.get('tags')),
+        parse_int(record.get('max_participants'), 0),
+    )
+
+
+def project_row(record):
+    """Кортеж аргументов add_projects_bulk из записи файла"""
+    return (
+        required(record, 'title'),
+        optional(record, 'description'),
+        optional(record, 'status', 'planning') or 'planning',
+        parse_int(record.get('owner_id')),
+    )
+
+
+# Вид данных -> (разбор записи, имя пакетного метода Database)
+IMPORTERS = {
+    'users': (user_row, 'add_users_bulk'),
+    'events': (event_row, 'add_events_bulk'),
+    'projects': (project_row, 'add_projects_bulk'),
+}
+
+
+def detect_format(path):
+    """Определить формат файла по расширению"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Неизвестный формат файла: {path} (ожидается .csv или .jsonl)")
+
+
+def read_records(path, fmt=None):
+    """Потоково читать записи файла: пары (номер строки, dict или исключение)"""
+    fmt = fmt or detect_format(path)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("строка должна содержать JSON-объект")
+                except ValueError as e:
+                    record = e
+                yield line_no, record
+
+
+def import_file(db, path, kind, fmt=None, chunk_size=1000):
+    """Импортировать users/events/projects из CSV или JSONL.
+
+    Файл читается потоково и вставляется пакетами по chunk_size строк,
+    каждый пакет — одной транзакцией. Баллы совпадений новых пользователей
+    пересчитываются один раз после всех пакетов. Ошибочные строки не прерывают импорт,
+    а попадают в отчет: {'imported': N, 'ids': [...], 'errors': [(строка, сообщение), ...]}.
+    """
+    if kind not in IMPORTERS:
+        raise ValueError(f"Неизвестный вид данных: {kind}")
+    parse, method = IMPORTERS[kind]
+    insert = getattr(db, method)
+    if kind == 'users':
+        insert = functools.partial(insert, refresh_scores=False)
+
+    report = {'imported': 0, 'ids': [], 'errors': []}
+    chunk = []
+
+    def flush():
+        try:
+            ids = insert([row for _, row in chunk])
+        except sqlite3.Error:
+            # Пакет не вставился целиком — вставляем по одной, чтобы найти виноватые строки
+            ids = []
+            for line_no, row in chunk:
+                try:
+                    ids.extend(insert([row]))
+                except sqlite3.Error as e:
+                    report['errors'].append((line_no, str(e)))
+        report['ids'].extend(ids)
+        report['imported'] += len(ids)
+        chunk.clear()
+
+    for line_no, record in read_records(path, fmt):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            chunk.append((line_no, parse(record)))
+        except (ValueError, TypeError) as e:
+            report['errors'].append((line_no, str(e)))
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+    if kind == 'users' and report['ids']:
+        db.rebuild_match_scores(report['ids'])
+    return report
@@ -0,0 +1,278 @@
+# storage/instrumentation.py
+"""Замеры слоя данных: число вызовов, гистограммы задержек и число строк
+для методов Database/EnhancedDatabase/RemoteDatabase и для каждого SQL-запроса.
+
+Включается переменной окружения COLLAB_METRICS=1 при запуске. Если она не
+задана, классы и соединения не оборачиваются, и накладных расходов нет.
+COLLAB_METRICS_FILE=путь — при выходе записать метрики в формате Prometheus.
+Соединения с замерами используются и для журнала медленных запросов
+(COLLAB_SLOW_QUERY_MS, см. slow_query_log.py).
+"""
+import atexit
+import bisect
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache, wraps
+
+ENABLED = os.environ.get('COLLAB_METRICS', '').lower() in ('1', 'true', 'yes', 'on')
+
+# Модуль журнала (и logging.handlers) загружается, только если журнал включен
+if os.environ.get('COLLAB_SLOW_QUERY_MS'):
+    from .slow_query_log import slow_log
+else:
+    slow_log = None
+
+# Служебные методы, которые не замеряются
+SKIP_METHODS = {'get_connection', 'close'}
+
+# Верхние границы корзин гистограммы, секунды (от 50 мкс до ~100 с)
+BUCKETS = tuple(0.00005 * 2 ** i for i in range(22))
+
+
+class Histogram:
+    """Гистограмма задержек с фиксированными корзинами"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.rows = 0
+
+    def observe(self, seconds, rows=None):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if rows:
+            self.rows += rows
+
+    def quantile(self, q):
+        """Оценка квантиля: верхняя граница корзины, в которую он попадает"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else float('inf')
+        return float('inf')
+
+
+class Metrics:
+    """Реестр гистограмм по видам (method, sql) и именам"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, kind, name, seconds, rows=None):
+        with self._lock:
+            histogram = self._histograms.get((kind, name))
+            if histogram is None:
+                histogram = self._histograms[(kind, name)] = Histogram()
+            histogram.observe(seconds, rows)
+
+    def add_rows(self, kind, name, rows):
+        with self._lock:
+            histogram = self._histograms.get((kind, name))
+            if histogram is not None:
+                histogram.rows += rows
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """Сводка: [{kind, name, calls, total_ms, p50_ms, p95_ms, p99_ms, rows}, ...]"""
+        with self._lock:
+            items = list(self._histograms.items())
+        summary = []
+        for (kind, name), h in items:
+            summary.append({
+                'kind': kind,
+                'name': name,
+                'calls': h.count,
+                'total_ms': round(h.sum * 1000, 3),
+                'p50_ms': round(h.quantile(0.50) * 1000, 3),
+                'p95_ms': round(h.quantile(0.95) * 1000, 3),
+                'p99_ms': round(h.quantile(0.99) * 1000, 3),
+                'rows': h.rows,
+            })
+        summary.sort(key=lambda item: item['total_ms'], reverse=True)
+        return summary
+
+    def report(self, limit=None):
+        """Текстовый отчет, самые затратные первыми"""
+        lines = [f"{'вид':<7}{'вызовов':>9}{'всего мс':>12}{'p50':>9}{'p95':>9}{'p99':>9}{'строк':>9}  имя"]
+        for item in self.snapshot()[:limit]:
+            lines.append(f"{item['kind']:<7}{item['calls']:>9}{item['total_ms']:>12.1f}{item['p50_ms']:>9.2f}"
+                         f"{item['p95_ms']:>9.2f}{item['p99_ms']:>9.2f}{item['rows']:>9}  {item['name']}")
+        return '\n'.join(lines)
+
+    def prometheus(self):
+        """Метрики в текстовом формате Prometheus"""
+        with self._lock:
+            items = [(key, list(h.counts), h.count, h.sum, h.rows) for key, h in self._histograms.items()]
+        lines = [
+            '# HELP collab_db_latency_seconds Latency of data layer calls',
+            '# TYPE collab_db_latency_seconds histogram',
+        ]
+        for (kind, name), counts, count, total, _ in items:
+            labels = f'kind="{kind}",name="{_escape(name)}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f'collab_db_latency_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'collab_db_latency_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'collab_db_latency_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'collab_db_latency_seconds_count{{{labels}}} {count}')
+        lines.append('# HELP collab_db_rows_total Rows returned by data layer calls')
+        lines.append('# TYPE collab_db_rows_total counter')
+        for (kind, name), _, _, _, rows in items:
+            lines.append(f'collab_db_rows_total{{kind="{kind}",name="{_escape(name)}"}} {rows}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Записать метрики в файл (атомарно через временный файл)"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+metrics = Metrics()
+
+
+_WHITESPACE = re.compile(r'\s+')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(\s*,\s*\?)+\s*\)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """Ключ запроса: одна строка без лишних пробелов, списки IN (?, ?, ...) свернуты"""
+    return _IN_LIST.sub('IN (?, ...)', _WHITESPACE.sub(' ', sql).strip())
+
+
+def count_rows(result):
+    """Число строк в результате метода: список, dict списков (search) или None"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict) and result and all(isinstance(v, list) for v in result.values()):
+        return sum(len(v) for v in result.values())
+    return None
+
+
+def _timed_method(func, prefix):
+    name = f'{prefix}.{func.__name__}'
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            metrics.observe('method', name, time.perf_counter() - start, count_rows(result))
+    return wrapper
+
+
+def instrumented(cls):
+    """Декоратор класса: замерять все публичные методы (без изменения сигнатур).
+
+    Без COLLAB_METRICS возвращает класс как есть.
+    """
+    if not ENABLED:
+        return cls
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or attr in SKIP_METHODS or not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+            continue
+        setattr(cls, attr, _timed_method(value, cls.__name__))
+    return cls
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Курсор, замеряющий execute/executemany и считающий полученные строки"""
+
+    _metric_name = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._observe(sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._observe(sql, seq_of_parameters, time.perf_counter() - start, many=True)
+
+    def _observe(self, sql, parameters, seconds, many=False):
+        self._metric_name = normalize_sql(sql)
+        if ENABLED:
+            metrics.observe('sql', self._metric_name, seconds)
+        if slow_log is not None and seconds >= slow_log.threshold:
+            slow_log.submit(self.connection.database_path, self._metric_name, sql, parameters, seconds, many)
+
+    def fetchone(self):
+        row = super().fetchone()
+        if ENABLED and row is not None:
+            metrics.add_rows('sql', self._metric_name, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if ENABLED:
+            metrics.add_rows('sql', self._metric_name, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if ENABLED:
+            metrics.add_rows('sql', self._metric_name, len(rows))
+        return rows
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Соединение, все запросы которого идут через InstrumentedCursor"""
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.database_path = os.fsdecode(database)
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute в C не вызывает переопределенный Cursor.execute
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            if ENABLED:
+                metrics.observe('sql', normalize_sql(script), time.perf_counter() - start)
+
+
+def connection_factory():
+    """Класс соединения для sqlite3.connect(factory=...)"""
+    return InstrumentedConnection if ENABLED or slow_log is not None else sqlite3.Connection
+
+
+if ENABLED and os.environ.get('COLLAB_METRICS_FILE'):
+    atexit.register(metrics.write_prometheus, os.environ['COLLAB_METRICS_FILE'])
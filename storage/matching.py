@@ -0,0 +1,537 @@
+# storage/matching.py
+import functools
+import heapq
+import json
+import math
+from collections import Counter
+from itertools import chain, compress, groupby, islice, repeat
+from operator import contains, itemgetter
+
+
+# Веса формулы совпадения
+SKILL_WEIGHT = 10
+INTEREST_WEIGHT = 5
+PROJECT_BONUS = 20
+
+# Ограничение числа параметров в одном запросе IN (...)
+IN_CHUNK = 500
+
+# Самых длинных списков вхождений, которые PairScorer.top не перебирает целиком
+LONG_LISTS = 6
+
+# Совпадений, которые хранятся в match_scores для каждого пользователя.
+# Не меньше лимита в интерфейсе (15); более дальние страницы считаются на лету.
+TOP_MATCHES = 20
+
+
+def match_score(common_skills, common_interests, both_looking):
+    """Балл совпадения двух пользователей"""
+    score = common_skills * SKILL_WEIGHT + common_interests * INTEREST_WEIGHT
+    if both_looking:
+        score += PROJECT_BONUS
+    return score
+
+
+def chunked(items, size=IN_CHUNK):
+    """Разбить список на части для запросов с IN (...)"""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class PairScorer:
+    """Баллы пользователя со всеми, у кого есть общий термин, по спискам вхождений в памяти.
+
+    Веса переводятся в единицы (общий делитель весов), и термин попадает в Counter
+    столько раз, сколько единиц он дает: пары считаются в C, без цикла Python
+    по каждой паре. Это в разы быстрее соединения user_skill с собой в SQL.
+    Загружаются только списки терминов переданных в load пользователей,
+    а флаг looking_for_project — только у пользователей из этих списков.
+
+    exclude — пользователи, пары с которыми scores не считает (см. refresh_scores).
+    """
+
+    def __init__(self, cursor, exclude=()):
+        self.cursor = cursor
+        self.unit = math.gcd(SKILL_WEIGHT, INTEREST_WEIGHT, PROJECT_BONUS)
+        self.bonus = PROJECT_BONUS // self.unit
+        self.tables = (('user_skill', SKILL_WEIGHT // self.unit), ('user_interest', INTEREST_WEIGHT // self.unit))
+        # Таблица -> {user_id: [term_id, ...]} и {term_id: {user_id, ...}}
+        self.terms = {table: {} for table, _ in self.tables}
+        self.postings = {table: {} for table, _ in self.tables}
+        # Списки вхождений без exclude, по мере надобности
+        self.exclude = set(exclude)
+        self.rest = {table: {} for table, _ in self.tables}
+        self.looking = set()
+
+    def load(self, user_ids=None):
+        """Загрузить термины пользователей и полные списки вхождений их терминов (None — всех)"""
+        cursor = self.cursor
+        if user_ids is None:
+            cursor.execute("SELECT id FROM users WHERE looking_for_project")
+            self.looking.update(row[0] for row in cursor.fetchall())
+        for table, _ in self.tables:
+            terms = self.terms[table]
+            postings = self.postings[table]
+            if user_ids is None:
+                cursor.execute(f"SELECT user_id, skill_id FROM {table}")
+                for user_id, term_id in cursor.fetchall():
+                    terms.setdefault(user_id, []).append(term_id)
+                    postings.setdefault(term_id, set()).add(user_id)
+                continue
+
+            new_users = [user_id for user_id in user_ids if user_id not in terms]
+            for ids in chunked(new_users):
+                placeholders = ', '.join('?' * len(ids))
+                cursor.execute(f"SELECT user_id, skill_id FROM {table} WHERE user_id IN ({placeholders})", ids)
+                for user_id, term_id in cursor.fetchall():
+                    terms.setdefault(user_id, []).append(term_id)
+            new_terms = set()
+            for user_id in new_users:
+                new_terms.update(term_id for term_id in terms.setdefault(user_id, []) if term_id not in postings)
+            for ids in chunked(new_terms):
+                placeholders = ', '.join('?' * len(ids))
+                cursor.execute(f'''
+                    SELECT t.skill_id, t.user_id, u.looking_for_project FROM {table} t
+                    JOIN users u ON u.id = t.user_id
+                    WHERE t.skill_id IN ({placeholders})
+                    ORDER BY t.skill_id
+                ''', ids)
+                rows = cursor.fetchall()
+                for term_id, group in groupby(rows, itemgetter(0)):
+                    postings[term_id] = set(map(itemgetter(1), group))
+                self.looking.update(compress(map(itemgetter(1), rows), map(itemgetter(2), rows)))
+
+    def _lists(self, user_id, postings):
+        """Списки вхождений терминов пользователя с весами: [(множество, единиц), ...]"""
+        return [(postings[table][term_id], weight)
+                for table, weight in self.tables for term_id in self.terms[table].get(user_id, ())]
+
+    def _count(self, user_id, lists, seen=None):
+        """Counter баллов в единицах; seen — считать только этих кандидатов"""
+        weighted = []
+        for postings, weight in lists:
+            weighted.extend([postings if seen is None else seen & postings] * weight)
+        if self.bonus and user_id in self.looking:
+            # Бонус тоже считается в C: множество ищущих среди кандидатов повторяется bonus раз
+            candidates = set(chain.from_iterable(postings for postings, _ in lists)) if seen is None else seen
+            weighted.extend([candidates & self.looking] * self.bonus)
+        counts = Counter(chain.from_iterable(weighted))
+        counts.pop(user_id, None)
+        return counts
+
+    def scores(self, user_id):
+        """Counter {other_id: балл в единицах} по всем вне exclude, у кого есть общий термин"""
+        if not self.exclude:
+            return self._count(user_id, self._lists(user_id, self.postings))
+        for table, _ in self.tables:
+            rest = self.rest[table]
+            for term_id in self.terms[table].get(user_id, ()):
+                if term_id not in rest:
+                    rest[term_id] = self.postings[table][term_id] - self.exclude
+        return self._count(user_id, self._lists(user_id, self.rest))
+
+    def top(self, user_id, top_k):
+        """(Counter, список) — top_k лучших совпадений пользователя и их баллы.
+
+        Кандидаты из коротких списков считаются целиком. Из LONG_LISTS самых
+        длинных (частые термины) берутся пересечения их подмножеств (вместе
+        с множеством ищущих проект) в порядке убывания суммарного веса: новый
+        кандидат из пересечения не входит ни в одно более тяжелое подмножество,
+        поэтому его балл и есть вес подмножества. Как только top_k встреченных
+        кандидатов набрали больше веса следующего подмножества, остальные в top_k
+        не попадут. Так стоимость зависит от коротких списков и пересечений,
+        а не от размера частых.
+        """
+        lists = sorted(self._lists(user_id, self.postings), key=lambda item: len(item[0]))
+        short, long = lists[:-LONG_LISTS], lists[-LONG_LISTS:]
+        seen = set().union(*(postings for postings, _ in short))
+        counts = self._count(user_id, lists, seen)
+        histogram = Counter(counts.values())
+
+        groups = list(long)
+        if self.bonus and user_id in self.looking:
+            groups.append((self.looking, self.bonus))
+        groups.sort(key=lambda item: len(item[0]))
+        sets = [postings for postings, _ in groups]
+        # Подмножество из одного множества ищущих — не общий термин
+        alone = sum(1 << i for i, postings in enumerate(sets) if postings is self.looking)
+
+        # Пересечение по маске групп: из пересечения без самого длинного множества
+        intersections = {}
+
+        def intersect(mask):
+            if mask not in intersections:
+                last = mask.bit_length() - 1
+                rest = mask ^ (1 << last)
+                if rest:
+                    part = intersect(rest)
+                    intersections[mask] = part & sets[last] if part else part
+                else:
+                    intersections[mask] = sets[last]
+            return intersections[mask]
+
+        for weight, mask in _subsets(tuple(weight for _, weight in groups), alone):
+            # Невстреченные кандидаты набирают не больше weight
+            if sum(number for score, number in histogram.items() if score > weight) >= top_k:
+                break
+            found = intersect(mask) - seen
+            found.discard(user_id)
+            if found:
+                seen |= found
+                histogram[weight] += len(found)
+                # Ключи не пересекаются со встреченными: dict.update без сложения, в C
+                dict.update(counts, dict.fromkeys(found, weight))
+        return counts, top_matches(counts, top_k)
+
+    def rows(self, user_id, counts, other_ids, mirror=False):
+        """Строки (user1_id, user2_id, skill_match, interest_match, total_score) для пар с other_ids.
+
+        mirror — строки (other_id, user_id): пара симметрична, общие термины те же.
+        """
+        skill_sets, interest_sets = ([self.postings[table][term_id] for term_id in self.terms[table].get(user_id, ())]
+                                     for table, _ in self.tables)
+        result = []
+        for other_id in other_ids:
+            pair = (other_id, user_id) if mirror else (user_id, other_id)
+            result.append((*pair, sum(map(contains, skill_sets, repeat(other_id))),
+                           sum(map(contains, interest_sets, repeat(other_id))), counts[other_id] * self.unit))
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def _subsets(weights, skip):
+    """Маски непустых подмножеств групп с весами weights по убыванию веса: [(вес, маска)], кроме skip"""
+    subsets = [(sum(weight for i, weight in enumerate(weights) if mask >> i & 1), mask)
+               for mask in range(1, 1 << len(weights)) if mask != skip]
+    return sorted(subsets, key=lambda item: item[0], reverse=True)
+
+
+def kth_score(counts, top_k):
+    """Балл top_k-го места в Counter (в нем не меньше top_k элементов).
+
+    Считается по гистограмме баллов (различных баллов немного), без сортировки кандидатов.
+    """
+    seen = 0
+    for score, number in sorted(Counter(counts.values()).items(), reverse=True):
+        seen += number
+        if seen >= top_k:
+            return score
+
+
+def top_matches(counts, top_k):
+    """top_k id из Counter по убыванию балла, при равенстве — по возрастанию id"""
+    if len(counts) > top_k:
+        # Отбор по баллу top_k-го места идет в C, без цикла Python по всем кандидатам
+        cutoff = kth_score(counts, top_k)
+        ids = sorted(compress(counts, map(cutoff.__le__, counts.values())))
+        scores = list(map(counts.__getitem__, ids))
+        above = list(compress(ids, map(cutoff.__lt__, scores)))
+        tied = islice(compress(ids, map(cutoff.__eq__, scores)), top_k - len(above))
+        ids = sorted(chain(above, tied))
+    else:
+        ids = sorted(counts)
+    # sorted устойчива: при равном балле сохраняется порядок id
+    return sorted(ids, key=counts.__getitem__, reverse=True)
+
+
+def refresh_scores(cursor, user_ids=None, top_k=TOP_MATCHES):
+    """Пересчитать таблицу match_scores для указанных пользователей (None — для всех).
+
+    Выполняется курсором вызывающего кода, то есть в его транзакции. Для каждого
+    пользователя хранятся только top_k лучших совпадений (строки (user1, user2)
+    по индексу (user1_id, total_score)), поэтому таблица растет линейно.
+    У измененных пользователей списки считаются заново; у остальных новые пары
+    добавляются, если попадают в top_k. Полный список, где измененный
+    пользователь опустился ниже прежнего top_k-го места, тоже считается
+    заново — иначе в нем не хватало бы следующего по порядку совпадения.
+
+    Списки считаются по PairScorer.top, а пары с остальными — только по спискам
+    вхождений терминов измененных пользователей, поэтому стоимость зависит от
+    них, а не от размера таблицы users.
+    """
+    insert = """
+        INSERT INTO match_scores (user1_id, user2_id, skill_match, interest_match, total_score)
+        VALUES (?, ?, ?, ?, ?)
+    """
+
+    if user_ids is None:
+        scorer = PairScorer(cursor)
+        scorer.load()
+        cursor.execute("DELETE FROM match_scores")
+        cursor.execute("SELECT id FROM users")
+        for ids in chunked(row[0] for row in cursor.fetchall()):
+            rows = []
+            for user_id in ids:
+                rows.extend(scorer.rows(user_id, *scorer.top(user_id, top_k)))
+            cursor.executemany(insert, rows)
+        return
+
+    dirty = set(user_ids)
+    # Пары измененных пользователей между собой войдут в их собственные списки
+    scorer = PairScorer(cursor, exclude=dirty)
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS dirty_users (id INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM dirty_users")
+    cursor.executemany("INSERT INTO dirty_users (id) VALUES (?)", [(i,) for i in dirty])
+
+    # Измененные пользователи в полных списках остальных и top_k-е место этих
+    # списков: {user2_id: {user1_id: (балл, (балл, id) top_k-го)}}
+    cursor.execute('''
+        SELECT m.user1_id, m.user2_id, m.total_score, f.total_score, f.user2_id FROM match_scores m
+        JOIN match_scores f ON f.id = (
+            SELECT id FROM match_scores
+            WHERE user1_id = m.user1_id
+            ORDER BY total_score DESC, user2_id
+            LIMIT 1 OFFSET ?
+        )
+        WHERE m.user2_id IN (SELECT id FROM dirty_users) AND m.user1_id NOT IN (SELECT id FROM dirty_users)
+    ''', (top_k - 1,))
+    previous = {}
+    for other_id, user_id, score, last_score, last_id in cursor.fetchall():
+        previous.setdefault(user_id, {})[other_id] = (score, (last_score, last_id))
+
+    cursor.execute('''
+        DELETE FROM match_scores
+        WHERE user1_id IN (SELECT id FROM dirty_users) OR user2_id IN (SELECT id FROM dirty_users)
+    ''')
+
+    scorer.load(dirty)
+    # Последнее совпадение в полном списке пользователя: (балл, id) или None, если список неполный
+    thresholds = {}
+    # Пользователи, чьи полные списки считаются заново, и пары, добавляемые в списки остальных
+    refill = set()
+    merged = {}
+    rows = []
+    for user_id in dirty:
+        rows.extend(scorer.rows(user_id, *scorer.top(user_id, top_k)))
+
+        counts = scorer.scores(user_id)
+        for other_id, (score, last) in previous.get(user_id, {}).items():
+            # Выше прежнего top_k-го места пользователь остается в списке и вернется
+            # через слияние ниже; ниже него следующее совпадение неизвестно
+            new_score = counts[other_id] * scorer.unit
+            if new_score < score and (new_score < last[0] or (new_score == last[0] and user_id > last[1])):
+                refill.add(other_id)
+
+        others = set(counts).difference(refill)
+        _load_thresholds(cursor, others - thresholds.keys(), thresholds, top_k)
+        accepted = []
+        for other_id in others:
+            score = counts[other_id] * scorer.unit
+            last = thresholds[other_id]
+            if last is None or score > last[0] or (score == last[0] and user_id < last[1]):
+                accepted.append(other_id)
+        for row in scorer.rows(user_id, counts, accepted, mirror=True):
+            merged.setdefault(row[0], []).append(row)
+
+    for ids in chunked(refill):
+        placeholders = ', '.join('?' * len(ids))
+        cursor.execute(f"DELETE FROM match_scores WHERE user1_id IN ({placeholders})", ids)
+    scorer.load(refill)
+    for user_id in refill:
+        merged.pop(user_id, None)
+        rows.extend(scorer.rows(user_id, *scorer.top(user_id, top_k)))
+    for merged_rows in merged.values():
+        rows.extend(merged_rows)
+    cursor.executemany(insert, rows)
+
+    # Списки, в которые добавились пары, обрезаются до top_k
+    cursor.execute("DELETE FROM dirty_users")
+    cursor.executemany("INSERT INTO dirty_users (id) VALUES (?)", [(i,) for i in merged])
+    cursor.execute('''
+        DELETE FROM match_scores WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user1_id ORDER BY total_score DESC, user2_id
+                ) AS position
+                FROM match_scores WHERE user1_id IN (SELECT id FROM dirty_users)
+            ) WHERE position > ?
+        )
+    ''', (top_k,))
+    cursor.execute("DELETE FROM dirty_users")
+
+
+def _load_thresholds(cursor, user_ids, thresholds, top_k):
+    """Дополнить thresholds: user_id -> (балл, id) top_k-го совпадения или None"""
+    if not user_ids:
+        return
+    # Один запрос на всех: id передаются массивом JSON, для каждого — поиск
+    # по индексу (user1_id, total_score) внутри SQLite, без вызова из Python на строку
+    cursor.execute('''
+        SELECT u.value, m.total_score, m.user2_id FROM json_each(?) u
+        LEFT JOIN match_scores m ON m.id = (
+            SELECT id FROM match_scores
+            WHERE user1_id = u.value
+            ORDER BY total_score DESC, user2_id
+            LIMIT 1 OFFSET ?
+        )
+    ''', (json.dumps(list(user_ids)), top_k - 1))
+    for user_id, score, other_id in cursor.fetchall():
+        thresholds[user_id] = None if score is None else (score, other_id)
+
+
+class MatchEngine:
+    """Поиск совпадений по обратному индексу навыков и интересов.
+
+    Списки вхождений термин -> пользователи хранятся в таблицах user_skill и
+    user_interest (индексы по skill_id), поэтому оцениваются только пользователи,
+    у которых есть хотя бы один общий навык или интерес. Первые top_k совпадений
+    каждого пользователя читаются из match_scores (read_matches), более дальние
+    страницы считаются на лету (find_matches).
+    """
+
+    def __init__(self, get_connection, top_k=TOP_MATCHES):
+        self.get_connection = get_connection
+        self.top_k = top_k
+
+    def _postings(self, cursor, table, user_id):
+        """Общие термины пользователя с другими: {other_id: [term_id, ...]} и имена терминов"""
+        cursor.execute(f'''
+            SELECT s.id, s.name FROM {table} t
+            JOIN skill s ON s.id = t.skill_id
+            WHERE t.user_id = ?
+        ''', (user_id,))
+        names = {row[0]: row[1] for row in cursor.fetchall()}
+
+        postings = {}
+        for term_ids in chunked(names):
+            placeholders = ', '.join('?' * len(term_ids))
+            cursor.execute(f'''
+                SELECT user_id, skill_id FROM {table}
+                WHERE skill_id IN ({placeholders}) AND user_id != ?
+            ''', (*term_ids, user_id))
+            for other_id, term_id in cursor.fetchall():
+                postings.setdefault(other_id, []).append(term_id)
+        return postings, names
+
+    def score_candidates(self, user_id):
+        """Оценить всех пользователей, имеющих общие термины с данным.
+
+        Возвращает словарь {other_id: (score, common_skills, common_interests)}
+        или None, если пользователя нет.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT looking_for_project FROM users WHERE id = ?", (user_id,))
+        user = cursor.fetchone()
+        if not user:
+            return None
+
+        skill_postings, skill_names = self._postings(cursor, 'user_skill', user_id)
+        interest_postings, interest_names = self._postings(cursor, 'user_interest', user_id)
+        candidates = skill_postings.keys() | interest_postings.keys()
+
+        # Бонус за поиск проекта нужен только если его ищет сам пользователь
+        looking = set()
+        if user[0]:
+            for ids in chunked(candidates):
+                placeholders = ', '.join('?' * len(ids))
+                cursor.execute(f'''
+                    SELECT id FROM users WHERE id IN ({placeholders}) AND looking_for_project
+                ''', ids)
+                looking.update(row[0] for row in cursor.fetchall())
+
+        scored = {}
+        for other_id in candidates:
+            common_skills = [skill_names[t] for t in skill_postings.get(other_id, ())]
+            common_interests = [interest_names[t] for t in interest_postings.get(other_id, ())]
+            score = match_score(len(common_skills), len(common_interests), other_id in looking)
+            scored[other_id] = (score, common_skills, common_interests)
+        return scored
+
+    def find_matches(self, user_id, limit=None, offset=0):
+        """Найти лучшие совпадения: по убыванию балла, при равенстве — по id"""
+        scored = self.score_candidates(user_id)
+        if not scored:
+            return []
+
+        def rank(other_id):
+            return scored[other_id][0], -other_id
+
+        if limit is None:
+            top = sorted(scored, key=rank, reverse=True)[offset:]
+        else:
+            top = heapq.nlargest(offset + limit, scored, key=rank)[offset:]
+
+        users = self.get_users(top)
+        matches = []
+        for other_id in top:
+            score, common_skills, common_interests = scored[other_id]
+            matches.append({
+                'user': users[other_id],
+                'score': score,
+                'common_skills': common_skills,
+                'common_interests': common_interests
+            })
+        return matches
+
+    def count_matches(self, user_id):
+        """Количество пользователей с хотя бы одним общим навыком или интересом"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*) FROM (
+                SELECT user_id FROM user_skill
+                WHERE skill_id IN (SELECT skill_id FROM user_skill WHERE user_id = ?) AND user_id != ?
+                UNION
+                SELECT user_id FROM user_interest
+                WHERE skill_id IN (SELECT skill_id FROM user_interest WHERE user_id = ?) AND user_id != ?
+            )
+        ''', (user_id, user_id, user_id, user_id))
+        return cursor.fetchone()[0]
+
+    def refresh_scores(self, cursor, user_ids=None):
+        """Пересчитать match_scores для указанных пользователей (None — для всех), см. refresh_scores"""
+        refresh_scores(cursor, user_ids, self.top_k)
+
+    def read_matches(self, user_id, limit=None, offset=0):
+        """Прочитать совпадения из match_scores по индексу (user1_id, total_score)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT user2_id, total_score FROM match_scores
+            WHERE user1_id = ?
+            ORDER BY total_score DESC, user2_id
+            LIMIT ? OFFSET ?
+        ''', (user_id, -1 if limit is None else limit, offset))
+        ranked = [(row[0], row[1]) for row in cursor.fetchall()]
+        if not ranked:
+            return []
+
+        other_ids = [other_id for other_id, _ in ranked]
+        common_skills = self._common_terms(cursor, 'user_skill', user_id, other_ids)
+        common_interests = self._common_terms(cursor, 'user_interest', user_id, other_ids)
+        users = self.get_users(other_ids)
+
+        return [{
+            'user': users[other_id],
+            'score': score,
+            'common_skills': common_skills.get(other_id, []),
+            'common_interests': common_interests.get(other_id, [])
+        } for other_id, score in ranked]
+
+    def _common_terms(self, cursor, table, user_id, other_ids):
+        """Общие термины пользователя с каждым из other_ids: {other_id: [name, ...]}"""
+        common = {}
+        for ids in chunked(other_ids):
+            placeholders = ', '.join('?' * len(ids))
+            cursor.execute(f'''
+                SELECT b.user_id, s.name FROM {table} a
+                JOIN {table} b ON b.skill_id = a.skill_id
+                JOIN skill s ON s.id = a.skill_id
+                WHERE a.user_id = ? AND b.user_id IN ({placeholders})
+            ''', (user_id, *ids))
+            for other_id, name in cursor.fetchall():
+                common.setdefault(other_id, []).append(name)
+        return common
+
+    def get_users(self, user_ids):
+        """Загрузить строки пользователей по списку id: {id: dict}"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        users = {}
+        for ids in chunked(user_ids):
+            placeholders = ', '.join('?' * len(ids))
+            cursor.execute(f"SELECT * FROM users WHERE id IN ({placeholders})", ids)
+            users.update((row['id'], dict(row)) for row in cursor.fetchall())
+        return users
@@ -0,0 +1,89 @@
+# storage/migrations.py
+"""Версионные миграции схемы SQLite.
+
+Миграция — (версия, описание, шаги); шаг — SQL-строка или функция от курсора.
+Примененные версии записываются в таблицу schema_version, поэтому каждая
+миграция выполняется в базе ровно один раз, а существующие файлы баз
+обновляются на месте при следующем запуске приложения.
+"""
+from .matching import refresh_scores
+
+# Миграции базы collabmatch.db (storage.collabmatch.Database)
+DATABASE_MIGRATIONS = [
+    (1, "Индексы для поиска по email, сортировок и проектов владельца", [
+        # Составные индексы (ключ, id) покрывают и простые выборки по users.name,
+        # events.start_date и projects.created_at
+        "CREATE INDEX IF NOT EXISTS idx_users_name_id ON users (name, id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_start_date_id ON events (start_date, id)",
+        "CREATE INDEX IF NOT EXISTS idx_projects_created_at_id ON projects (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)",
+        "CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects (owner_id)",
+    ]),
+    (2, "Только лучшие совпадения каждого пользователя в match_scores", [
+        # Раньше хранились все пары в обе стороны — O(N^2) строк
+        refresh_scores,
+    ]),
+]
+
+# Миграции базы student_collab.db (storage.student_collab.EnhancedDatabase)
+ENHANCED_MIGRATIONS = [
+    (1, "Индексы для чата, заявок и участников проектов", [
+        "CREATE INDEX IF NOT EXISTS idx_messages_project_created ON messages (project_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_user ON applications (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_project_members_project ON project_members (project_id)",
+    ]),
+    (2, "Число итераций PBKDF2 у каждого пользователя", [
+        # Существующие хеши вычислены со 100000 итераций (passwords.LEGACY_ITERATIONS)
+        "ALTER TABLE users ADD COLUMN password_iterations INTEGER NOT NULL DEFAULT 100000",
+    ]),
+    (3, "История чата постранично по (project_id, id)", [
+        "CREATE INDEX IF NOT EXISTS idx_messages_project_id ON messages (project_id, id)",
+        # Сообщения больше не сортируются по created_at
+        "DROP INDEX IF EXISTS idx_messages_project_created",
+    ]),
+]
+
+
+def get_schema_version(conn):
+    """Текущая версия схемы (0, если миграции еще не применялись)"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(conn, migrations):
+    """Применить к базе все миграции новее ее версии, по порядку.
+
+    Каждая миграция выполняется в отдельной транзакции вместе с записью
+    в schema_version: при ошибке она откатывается целиком, а более ранние
+    остаются примененными. Возвращает список примененных версий.
+    """
+    applied = []
+    current = get_schema_version(conn)
+    for version, description, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            # Другой процесс мог успеть применить миграцию, пока ждали блокировку
+            cursor.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,))
+            if cursor.fetchone():
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                           (version, description))
+        applied.append(version)
+    return applied
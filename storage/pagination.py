@@ -0,0 +1,65 @@
+# storage/pagination.py
+"""Постраничная выборка по ключу (keyset): следующая страница начинается
+сразу после последней строки предыдущей, без OFFSET.
+
+Курсор — пара (значение колонки сортировки, id) последней строки страницы.
+Строки с NULL в колонке сортировки идут, как принято в SQLite, первыми при
+сортировке по возрастанию и последними при сортировке по убыванию; для них
+выборка идет отдельным отрезком, чтобы каждый запрос оставался диапазоном индекса.
+"""
+
+PAGE_SIZE = 50
+
+
+def _segments(column, descending, after):
+    """Отрезки выборки в порядке страниц: (условие WHERE, параметры, ORDER BY)"""
+    direction = 'DESC' if descending else 'ASC'
+    compare = '<' if descending else '>'
+    order_values = f"{column} {direction}, id {direction}"
+    order_nulls = f"id {direction}"
+
+    if after is None:
+        values = (f"{column} IS NOT NULL", (), order_values)
+        nulls = (f"{column} IS NULL", (), order_nulls)
+    else:
+        last_value, last_id = after
+        if last_value is None:
+            # По убыванию NULL-строки последние, непустые значения уже пройдены
+            values = None if descending else (f"{column} IS NOT NULL", (), order_values)
+            nulls = (f"{column} IS NULL AND id {compare} ?", (last_id,), order_nulls)
+        else:
+            values = (f"({column}, id) {compare} (?, ?)", (last_value, last_id), order_values)
+            nulls = (f"{column} IS NULL", (), order_nulls)
+
+    if descending:
+        segments = [values, nulls]
+    elif after is not None and after[0] is not None:
+        # По возрастанию NULL-строки уже пройдены
+        segments = [values]
+    else:
+        segments = [nulls, values]
+    return [segment for segment in segments if segment is not None]
+
+
+def keyset_page(cursor, table, column, descending=False, after=None, page_size=PAGE_SIZE):
+    """Страница строк table, упорядоченных по (column, id).
+
+    after — курсор последней строки предыдущей страницы или None для первой.
+    Возвращает (строки, курсор следующей страницы или None, если страниц больше нет).
+    """
+    rows = []
+    for condition, params, order_by in _segments(column, descending, after):
+        cursor.execute(f'''
+            SELECT * FROM {table}
+            WHERE {condition}
+            ORDER BY {order_by}
+            LIMIT ?
+        ''', (*params, page_size - len(rows)))
+        rows.extend(cursor.fetchall())
+        if len(rows) >= page_size:
+            break
+
+    next_cursor = None
+    if rows and len(rows) >= page_size:
+        next_cursor = (rows[-1][column], rows[-1]['id'])
+    return rows, next_cursor
@@ -0,0 +1,48 @@
+# storage/passwords.py
+"""Хеширование паролей PBKDF2-HMAC-SHA256 с числом итераций у каждого пользователя.
+
+Число итераций хранится рядом с хешем, поэтому стоимость можно поменять
+(COLLAB_PBKDF2_ITERATIONS) без поломки старых аккаунтов: они проверяются
+со своим числом итераций и перехешируются при следующем успешном входе.
+Функции не обращаются к базе и GUI, их можно вызывать из рабочего потока.
+"""
+import hashlib
+import hmac
+import os
+
+# Число итераций, с которым созданы аккаунты до появления колонки password_iterations
+LEGACY_ITERATIONS = 100000
+DEFAULT_ITERATIONS = int(os.environ.get('COLLAB_PBKDF2_ITERATIONS', LEGACY_ITERATIONS))
+
+# Хеш и соль для несуществующего пользователя: его проверка идет с тем же числом
+# итераций, что и у новых аккаунтов, и занимает столько же времени
+_DUMMY_HASH = _DUMMY_SALT = '0' * 64
+
+
+def new_salt():
+    return os.urandom(32).hex()
+
+
+def hash_password(password, salt, iterations=DEFAULT_ITERATIONS):
+    """Хеш пароля в hex (соль — hex-строка, как в существующих записях)"""
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations).hex()
+
+
+def make_password_record(password, iterations=DEFAULT_ITERATIONS):
+    """Новая запись (hash, salt, iterations) для сохранения в users"""
+    salt = new_salt()
+    return hash_password(password, salt, iterations), salt, iterations
+
+
+def check_password(password, record, iterations=DEFAULT_ITERATIONS):
+    """Проверить пароль по записи (hash, salt, iterations) или None.
+
+    Возвращает (верен ли пароль, новая запись или None). Новая запись
+    вычисляется, если пароль верен, а число итераций устарело.
+    """
+    password_hash, salt, stored_iterations = record or (_DUMMY_HASH, _DUMMY_SALT, iterations)
+    candidate = hash_password(password, salt, stored_iterations or LEGACY_ITERATIONS)
+    ok = hmac.compare_digest(candidate, password_hash) and record is not None
+    if ok and stored_iterations != iterations:
+        return ok, make_password_record(password, iterations)
+    return ok, None
@@ -1,4 +1,4 @@
-# remote_database.py
+# storage/remote_database.py
 import sqlite3
 import json
 import urllib.request
@@ -7,7 +7,10 @@ from datetime import datetime
 import tempfile
 import os
 
+from .instrumentation import connection_factory, instrumented
 
+
+@instrumented
 class RemoteDatabase:
     """Класс для работы с удаленной SQLite базой через SSH/WebDAV"""
 
@@ -88,7 +91,7 @@ class RemoteDatabase:
 
     def create_empty_database(self):
         """Создать пустую базу данных"""
-        conn = sqlite3.connect(self.local_db_path)
+        conn = sqlite3.connect(self.local_db_path, factory=connection_factory())
         cursor = conn.cursor()
 
         # Таблица пользователей
@@ -126,7 +129,7 @@ class RemoteDatabase:
     def get_connection(self):
         """Получить соединение с базой данных"""
         if self.local_cache and self.local_db_path:
-            conn = sqlite3.connect(self.local_db_path)
+            conn = sqlite3.connect(self.local_db_path, factory=connection_factory())
             conn.row_factory = sqlite3.Row
             return conn
         else:
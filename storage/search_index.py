@@ -0,0 +1,127 @@
+# storage/search_index.py
+"""Полнотекстовые и триграммные индексы SQLite FTS5 поверх обычных таблиц."""
+
+# Индексируемые колонки: FTS-таблица -> (таблица с данными, колонки, веса BM25)
+FTS_INDEXES = {
+    'users_fts': ('users', ('name', 'email', 'skills', 'interests', 'status'), (10.0, 2.0, 5.0, 3.0, 1.0)),
+    'events_fts': ('events', ('title', 'description', 'tags', 'location'), (10.0, 2.0, 5.0, 1.0)),
+    'projects_fts': ('projects', ('title', 'description', 'status'), (10.0, 2.0, 1.0)),
+}
+
+# Триграммные индексы для поиска подстроки: FTS-таблица -> (таблица с данными, колонки)
+TRIGRAM_INDEXES = {
+    'users_trgm': ('users', ('name', 'email', 'skills', 'interests', 'status')),
+    'events_trgm': ('events', ('title', 'description', 'tags', 'location')),
+    'projects_trgm': ('projects', ('title', 'description', 'status')),
+}
+
+DEFAULT_TOKENIZER = 'unicode61 remove_diacritics 2'
+TRIGRAM_TOKENIZER = 'trigram'
+
+
+def create_fts_index(cursor, fts_table, content_table, columns, tokenize=DEFAULT_TOKENIZER):
+    """Создать FTS5-индекс над content_table с триггерами синхронизации.
+
+    Индекс использует внешнее содержимое (content=...), то есть хранит только
+    инвертированные списки, а сами строки читаются из исходной таблицы.
+    Если индекс создается впервые, он заполняется по существующим строкам.
+    Возвращает True, если индекс был создан.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,))
+    if cursor.fetchone():
+        return False
+
+    cols = ', '.join(columns)
+    new_cols = ', '.join(f'new.{c}' for c in columns)
+    old_cols = ', '.join(f'old.{c}' for c in columns)
+
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE {fts_table} USING fts5(
+            {cols}, content='{content_table}', content_rowid='id', tokenize='{tokenize}'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN
+            INSERT INTO {fts_table} (rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {content_table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts_table} (rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    ''')
+    rebuild_fts_index(cursor, fts_table)
+    return True
+
+
+def rebuild_fts_index(cursor, fts_table):
+    """Перестроить FTS5-индекс по исходной таблице"""
+    cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+def build_match_query(text):
+    """Превратить пользовательский ввод в выражение FTS5 MATCH.
+
+    Каждое слово берется в кавычки (операторы FTS5 в вводе не действуют)
+    и ищется по префиксу; слова объединяются через AND.
+    Возвращает None, если в запросе нет ни одного слова.
+    """
+    terms = ['"' + term.replace('"', '""') + '"*' for term in text.split()
+             if any(ch.isalnum() for ch in term)]
+    return ' AND '.join(terms) if terms else None
+
+
+def fts_search(cursor, fts_table, content_table, weights, match, order_by, limit=None, offset=0):
+    """Найти строки content_table по FTS-индексу, упорядочив по BM25"""
+    bm25_args = ', '.join(str(w) for w in weights)
+    cursor.execute(f'''
+        SELECT t.* FROM {fts_table}
+        JOIN {content_table} t ON t.id = {fts_table}.rowid
+        WHERE {fts_table} MATCH ?
+        ORDER BY bm25({fts_table}, {bm25_args}), {order_by}
+        LIMIT ? OFFSET ?
+    ''', (match, -1 if limit is None else limit, offset))
+    return cursor.fetchall()
+
+
+def quote_phrase(text):
+    """Взять текст в кавычки как одну фразу FTS5"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def can_use_trigrams(text):
+    """Можно ли искать подстроку по триграммам.
+
+    Триграммам нужно не меньше трех символов, а % и _ в LIKE — шаблоны,
+    которые индекс не выражает; в этих случаях остается полный просмотр.
+    """
+    return len(text) >= 3 and '%' not in text and '_' not in text
+
+
+def substring_search(cursor, trgm_table, content_table, columns, text, order_by, limit=None, offset=0):
+    """Найти строки, где хотя бы одна колонка содержит text (как LIKE '%text%').
+
+    Кандидаты берутся пересечением триграммных списков, затем проверяются
+    тем же условием LIKE, поэтому результат совпадает с полным просмотром.
+    """
+    pattern = f"%{text}%"
+    condition = ' OR '.join(f'{column} LIKE ?' for column in columns)
+    params = [pattern] * len(columns)
+
+    if can_use_trigrams(text):
+        condition = f"id IN (SELECT rowid FROM {trgm_table} WHERE {trgm_table} MATCH ?) AND ({condition})"
+        params.insert(0, quote_phrase(text))
+
+    cursor.execute(f'''
+        SELECT * FROM {content_table}
+        WHERE {condition}
+        ORDER BY {order_by}
+        LIMIT ? OFFSET ?
+    ''', (*params, -1 if limit is None else limit, offset))
+    return cursor.fetchall()
@@ -0,0 +1,150 @@
+# storage/slow_query_log.py
+"""Журнал медленных SQL-запросов с планом EXPLAIN QUERY PLAN.
+
+Включается переменной окружения COLLAB_SLOW_QUERY_MS (порог в миллисекундах),
+файл задается COLLAB_SLOW_QUERY_LOG (по умолчанию slow_queries.log).
+Вызывающий поток только кладет запись в очередь; план запроса, форматирование
+и запись в файл с ротацией выполняются в отдельном потоке QueueListener.
+Каждый нормализованный запрос логируется с планом один раз, повторы —
+одной строкой с номером повтора.
+"""
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+
+def describe_params(params):
+    """Форма параметров без значений: (int, str[12], None)"""
+    def shape(value):
+        if value is None:
+            return 'None'
+        if isinstance(value, (str, bytes)):
+            return f'{type(value).__name__}[{len(value)}]'
+        return type(value).__name__
+
+    if params is None:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{key}: {shape(value)}' for key, value in params.items()) + '}'
+    return '(' + ', '.join(shape(value) for value in params) + ')'
+
+
+class PlanHandler(logging.Handler):
+    """Обработчик в потоке слушателя: дописывает план запроса и пишет в файл"""
+
+    def __init__(self, target):
+        super().__init__()
+        self.target = target
+        self.seen = {}
+        self.connections = {}
+
+    def explain(self, db_path, sql, params):
+        """EXPLAIN QUERY PLAN на отдельном соединении только для чтения"""
+        if not db_path or db_path == ':memory:':
+            return ['план недоступен для базы в памяти']
+        if params is None:
+            return ['план недоступен: параметры executemany не сохранены']
+        try:
+            conn = self.connections.get(db_path)
+            if conn is None:
+                conn = sqlite3.connect(f'file:{os.path.abspath(db_path)}?mode=ro', uri=True,
+                                       check_same_thread=False)
+                self.connections[db_path] = conn
+            rows = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+        except sqlite3.Error as e:
+            return [f'план недоступен: {e}']
+        depth = {0: -1}
+        lines = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, 0) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return lines
+
+    def emit(self, record):
+        query = getattr(record, 'slow_query', None)
+        if query is None:
+            self.target.handle(record)
+            return
+        count = self.seen.get(query['key'], 0) + 1
+        self.seen[query['key']] = count
+        if count == 1:
+            lines = [
+                f"{query['ms']:.1f} мс, база {query['db']}",
+                f"SQL: {query['key']}",
+                f"параметры: {query['shape']}",
+                "план:",
+            ] + ['  ' + line for line in self.explain(query['db'], query['sql'], query['params'])]
+            record.msg = '\n'.join(lines)
+        else:
+            record.msg = f"{query['ms']:.1f} мс, повтор №{count}: {query['key']}"
+        record.args = None
+        self.target.handle(record)
+
+    def close(self):
+        for conn in self.connections.values():
+            conn.close()
+        self.connections.clear()
+        self.target.close()
+        super().close()
+
+
+class SlowQueryLog:
+    """Журнал медленных запросов: порог, очередь и поток записи"""
+
+    def __init__(self, path, threshold_ms, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        self.threshold = threshold_ms / 1000
+        self.queue = queue.SimpleQueue()
+
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter('%(asctime)s медленный запрос: %(message)s'))
+        self.handler = PlanHandler(file_handler)
+        self.listener = QueueListener(self.queue, self.handler)
+
+        self.logger = logging.getLogger('collab.slow_queries')
+        self.logger.setLevel(logging.WARNING)
+        self.logger.propagate = False
+        self.logger.addHandler(QueueHandler(self.queue))
+        self.listener.start()
+
+    def submit(self, db_path, key, sql, params, seconds, many=False):
+        """Передать медленный запрос в поток журнала"""
+        if many:
+            params = params[0] if isinstance(params, (list, tuple)) and params else None
+            shape = 'много × ' + describe_params(params)
+        else:
+            shape = describe_params(params)
+        self.logger.warning('%s', key, extra={'slow_query': {
+            'db': db_path,
+            'key': key,
+            'sql': sql,
+            'params': params,
+            'shape': shape,
+            'ms': seconds * 1000,
+        }})
+
+    def stop(self):
+        """Дописать очередь и закрыть файл (повторный вызов ничего не делает)"""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+        self.handler.close()
+        atexit.unregister(self.stop)
+
+
+def _from_environment():
+    threshold = os.environ.get('COLLAB_SLOW_QUERY_MS')
+    if not threshold:
+        return None
+    log = SlowQueryLog(os.environ.get('COLLAB_SLOW_QUERY_LOG', 'slow_queries.log'), float(threshold))
+    atexit.register(log.stop)
+    return log
+
+
+slow_log = _from_environment()
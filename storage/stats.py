@@ -0,0 +1,103 @@
+# storage/stats.py
+"""Счетчики статистики, которые поддерживаются триггерами при каждой записи."""
+
+STATS_COLUMNS = ('total_users', 'total_events', 'looking_for_project', 'total_projects', 'unique_skills')
+
+# Триггеры: имя -> (событие, тело)
+STATS_TRIGGERS = {
+    'stats_users_ai': ('AFTER INSERT ON users', '''
+        UPDATE stats SET total_users = total_users + 1,
+                         looking_for_project = looking_for_project + (new.looking_for_project = 1)
+        WHERE id = 1;
+    '''),
+    'stats_users_ad': ('AFTER DELETE ON users', '''
+        UPDATE stats SET total_users = total_users - 1,
+                         looking_for_project = looking_for_project - (old.looking_for_project = 1)
+        WHERE id = 1;
+    '''),
+    'stats_users_au': ('AFTER UPDATE OF looking_for_project ON users', '''
+        UPDATE stats SET looking_for_project = looking_for_project
+                         + (new.looking_for_project = 1) - (old.looking_for_project = 1)
+        WHERE id = 1;
+    '''),
+    'stats_events_ai': ('AFTER INSERT ON events', '''
+        UPDATE stats SET total_events = total_events + 1 WHERE id = 1;
+    '''),
+    'stats_events_ad': ('AFTER DELETE ON events', '''
+        UPDATE stats SET total_events = total_events - 1 WHERE id = 1;
+    '''),
+    'stats_projects_ai': ('AFTER INSERT ON projects', '''
+        UPDATE stats SET total_projects = total_projects + 1 WHERE id = 1;
+    '''),
+    'stats_projects_ad': ('AFTER DELETE ON projects', '''
+        UPDATE stats SET total_projects = total_projects - 1 WHERE id = 1;
+    '''),
+    # Уникальные навыки: счетчик ссылок на каждый навык, навык учитывается, пока ссылок больше нуля
+    'stats_user_skill_ai': ('AFTER INSERT ON user_skill', '''
+        INSERT INTO skill_refs (skill_id, refs) VALUES (new.skill_id, 1)
+            ON CONFLICT (skill_id) DO UPDATE SET refs = refs + 1;
+        UPDATE stats SET unique_skills = unique_skills + 1
+        WHERE id = 1 AND (SELECT refs FROM skill_refs WHERE skill_id = new.skill_id) = 1;
+    '''),
+    'stats_user_skill_ad': ('AFTER DELETE ON user_skill', '''
+        UPDATE skill_refs SET refs = refs - 1 WHERE skill_id = old.skill_id;
+        UPDATE stats SET unique_skills = unique_skills - 1
+        WHERE id = 1 AND (SELECT refs FROM skill_refs WHERE skill_id = old.skill_id) = 0;
+        DELETE FROM skill_refs WHERE skill_id = old.skill_id AND refs = 0;
+    '''),
+}
+
+
+def create_stats(cursor):
+    """Создать таблицу счетчиков и триггеры.
+
+    Если таблица создается впервые, счетчики заполняются по текущим данным.
+    Требует таблиц users, events, projects и user_skill.
+    Возвращает True, если таблица была создана.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats'")
+    if cursor.fetchone():
+        return False
+
+    counters = ',\n'.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in STATS_COLUMNS)
+    cursor.execute(f'''
+        CREATE TABLE stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            {counters}
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS skill_refs (
+            skill_id INTEGER PRIMARY KEY,
+            refs INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for name, (event, body) in STATS_TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+    rebuild_stats(cursor)
+    return True
+
+
+def rebuild_stats(cursor):
+    """Пересчитать счетчики полным просмотром таблиц"""
+    cursor.execute("DELETE FROM skill_refs")
+    cursor.execute('''
+        INSERT INTO skill_refs (skill_id, refs)
+        SELECT skill_id, COUNT(*) FROM user_skill GROUP BY skill_id
+    ''')
+    cursor.execute(f'''
+        INSERT OR REPLACE INTO stats (id, {', '.join(STATS_COLUMNS)})
+        SELECT 1,
+               (SELECT COUNT(*) FROM users),
+               (SELECT COUNT(*) FROM events),
+               (SELECT COUNT(*) FROM users WHERE looking_for_project = 1),
+               (SELECT COUNT(*) FROM projects),
+               (SELECT COUNT(*) FROM skill_refs)
+    ''')
+
+
+def read_stats(cursor):
+    """Прочитать счетчики одной строкой"""
+    cursor.execute(f"SELECT {', '.join(STATS_COLUMNS)} FROM stats WHERE id = 1")
+    row = cursor.fetchone()
+    return dict(zip(STATS_COLUMNS, row)) if row else dict.fromkeys(STATS_COLUMNS, 0)
@@ -0,0 +1,52 @@
+# storage/streaming.py
+"""Потоковое чтение больших выборок: пачки fetchmany в одной транзакции чтения."""
+import json
+
+# Размер пачки fetchmany по умолчанию
+CHUNK_SIZE = 1000
+
+
+def decode_list(value):
+    """Разобрать JSON-список из колонки; битое значение дает пустой список"""
+    if not value:
+        return []
+    try:
+        items = json.loads(value)
+    except ValueError:
+        return []
+    return items if isinstance(items, list) else []
+
+
+def split_list(value):
+    """Разобрать список через запятую (колонки skills в registration.py)"""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def stream_chunks(conn, sql, params=(), chunk_size=CHUNK_SIZE):
+    """Выполнить запрос и отдавать строки пачками по chunk_size.
+
+    conn — отдельное соединение, которым владеет генератор: все пачки читаются
+    в одной явной транзакции (один снимок базы), по окончании или при закрытии
+    генератора транзакция завершается, а соединение закрывается.
+    """
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN")
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.close()
+
+
+def stream_rows(conn, sql, params=(), chunk_size=CHUNK_SIZE):
+    """То же, что stream_chunks, но по одной строке"""
+    for rows in stream_chunks(conn, sql, params, chunk_size):
+        yield from rows
@@ -0,0 +1,488 @@
+# storage/student_collab.py
+"""Хранилище StudentCollab (student_collab.db) без зависимостей от GUI"""
+import sqlite3
+from .db_pool import ConnectionPool
+from .instrumentation import instrumented
+from .matching import chunked
+from .migrations import ENHANCED_MIGRATIONS, migrate
+from .passwords import DEFAULT_ITERATIONS, check_password, make_password_record
+from .search_index import TRIGRAM_TOKENIZER, can_use_trigrams, create_fts_index, quote_phrase
+from .streaming import CHUNK_SIZE, split_list, stream_rows
+from .write_queue import WriteQueue
+
+# Понятные сообщения о нарушении уникальности при массовом создании аккаунтов
+DUPLICATE_MESSAGES = {
+    'UNIQUE constraint failed: users.email': "email уже используется",
+    'UNIQUE constraint failed: users.username': "имя пользователя уже используется",
+}
+
+# Сообщений чата на одной странице истории
+MESSAGES_PAGE_SIZE = 50
+
+
+@instrumented
+class EnhancedDatabase:
+    def __init__(self, db_path="student_collab.db", password_iterations=DEFAULT_ITERATIONS):
+        # Используем файловую базу данных для сохранения данных
+        self.db_path = db_path
+        # Число итераций PBKDF2 для новых и перехешируемых паролей
+        self.password_iterations = password_iterations
+        # Соединение на поток для чтения (WAL: читатели не ждут писателя)
+        # и единственный поток записи с групповой фиксацией
+        self.pool = ConnectionPool(db_path, row_factory=None)
+        self.writer = WriteQueue(self.pool.connect)
+        self.init_db()
+    
+    def get_connection(self):
+        """Соединение текущего потока для чтения"""
+        return self.pool.get()
+    
+    def close(self):
+        """Дописать очередь записи и закрыть все соединения"""
+        self.writer.close()
+        self.pool.close_all()
+    
+    def init_db(self):
+        # Схема создается до запуска потока записи, на отдельном соединении
+        conn = self.pool.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE,
+                email TEXT UNIQUE,
+                password_hash TEXT,
+                password_salt TEXT,
+                direction TEXT,
+                skills TEXT,
+                avatar TEXT DEFAULT '👤',
+                bio TEXT DEFAULT '',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT,
+                description TEXT,
+                skills TEXT,
+                author_id INTEGER,
+                category TEXT DEFAULT 'Другое',
+                status TEXT DEFAULT 'open',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (author_id) REFERENCES users (id)
+            )
+            ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS applications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER,
+                user_id INTEGER,
+                message TEXT,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (project_id) REFERENCES projects (id),
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                UNIQUE(project_id, user_id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS project_members (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER,
+                user_id INTEGER,
+                role TEXT DEFAULT 'member',
+                joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (project_id) REFERENCES projects (id),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER,
+                user_id INTEGER,
+                message TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (project_id) REFERENCES projects (id),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+
+        # Триграммный индекс для поиска проектов по подстроке
+        create_fts_index(cursor, 'projects_trgm', 'projects', ('title', 'description', 'skills'),
+                         tokenize=TRIGRAM_TOKENIZER)
+        conn.commit()
+
+        # Индексы и дальнейшие изменения схемы — версионными миграциями
+        migrate(conn, ENHANCED_MIGRATIONS)
+        conn.close()
+    
+    def create_user(self, username, email, password, direction, skills='', avatar='👤', bio=''):
+        # Генерируем соль и хешируем пароль
+        record = make_password_record(password, self.password_iterations)
+        return self.create_user_with_hash(username, email, record, direction, skills, avatar, bio)
+    
+    def create_user_with_hash(self, username, email, record, direction, skills='', avatar='👤', bio=''):
+        """Создать пользователя с заранее вычисленной записью (hash, salt, iterations)"""
+        def write(cursor):
+            password_hash, salt, iterations = record
+            cursor.execute('''
+                INSERT INTO users (username, email, password_hash, password_salt, password_iterations,
+                                   direction, skills, avatar, bio)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (username, email, password_hash, salt, iterations, direction, skills, avatar, bio))
+            return cursor.lastrowid
+        
+        try:
+            return self.writer.call(write)
+        except Exception as e:
+            print(f"Error creating user: {e}")
+            return None
+    
+    def create_users_bulk(self, users):
+        """Вставить пользователей одной транзакцией.
+        
+        users: [(username, email, (hash, salt, iterations), direction, skills), ...]
+        Возвращает по строке на пользователя: (id, None) или (None, текст ошибки) —
+        строка с занятым email или именем откатывается одна, остальные вставляются.
+        """
+        def write(cursor):
+            results = []
+            for username, email, (password_hash, salt, iterations), direction, skills in users:
+                try:
+                    cursor.execute('''
+                        INSERT INTO users (username, email, password_hash, password_salt, password_iterations,
+                                           direction, skills)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', (username, email, password_hash, salt, iterations, direction, skills))
+                    results.append((cursor.lastrowid, None))
+                except sqlite3.IntegrityError as e:
+                    results.append((None, DUPLICATE_MESSAGES.get(str(e), str(e))))
+            return results
+        
+        return self.writer.call(write)
+    
+    def find_existing_accounts(self, usernames, emails):
+        """Какие из usernames и emails уже заняты: (множество имен, множество email)"""
+        cursor = self.get_connection().cursor()
+        taken = {'username': set(), 'email': set()}
+        for column, values in (('username', list(usernames)), ('email', list(emails))):
+            for chunk in chunked(values):
+                cursor.execute(
+                    f"SELECT {column} FROM users WHERE {column} IN ({', '.join('?' * len(chunk))})", chunk)
+                taken[column].update(row[0] for row in cursor.fetchall())
+        return taken['username'], taken['email']
+    
+    def get_password_record(self, email):
+        """(id, (hash, salt, iterations)) пользователя или None"""
+        cursor = self.get_connection().cursor()
+        cursor.execute('''
+            SELECT id, password_hash, password_salt, password_iterations FROM users WHERE email = ?
+        ''', (email,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return row[0], (row[1], row[2], row[3])
+    
+    def update_password_record(self, user_id, record):
+        """Сохранить перевычисленный хеш (например, с новым числом итераций)"""
+        password_hash, salt, iterations = record
+        self.writer.call(lambda cursor: cursor.execute('''
+            UPDATE users SET password_hash = ?, password_salt = ?, password_iterations = ? WHERE id = ?
+        ''', (password_hash, salt, iterations, user_id)))
+    
+    def verify_password(self, email, password):
+        found = self.get_password_record(email)
+        user_id, record = found if found else (None, None)
+        
+        # Сравнение за постоянное время; устаревшее число итераций обновляется
+        ok, new_record = check_password(password, record, self.password_iterations)
+        if new_record:
+            self.update_password_record(user_id, new_record)
+        return ok
+    
+    def get_user_by_email(self, email):
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
+        return cursor.fetchone()
+    
+    def get_user_by_id(self, user_id):
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+        return cursor.fetchone()
+    
+    def update_user(self, user_id, username=None, direction=None, skills=None, bio=None):
+        try:
+            updates = []
+            params = []
+            
+            if username:
+                updates.append("username = ?")
+                params.append(username)
+            if direction:
+                updates.append("direction = ?")
+                params.append(direction)
+            if skills is not None:
+                updates.append("skills = ?")
+                params.append(skills)
+            if bio is not None:
+                updates.append("bio = ?")
+                params.append(bio)
+            
+            if not updates:
+                return False
+            
+            params.append(user_id)
+            query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
+            self.writer.call(lambda cursor: cursor.execute(query, tuple(params)))
+            return True
+        except Exception as e:
+            print(f"Error updating user: {e}")
+            return False
+    
+    def get_all_projects(self, search_query="", category_filter="all", skills_filter=""):
+        cursor = self.get_connection().cursor()
+        query = '''
+            SELECT p.*, u.username as author_name 
+            FROM projects p 
+            LEFT JOIN users u ON p.author_id = u.id 
+            WHERE p.status = "open"
+        '''
+        params = []
+        
+        # Кандидаты из триграммного индекса; условия LIKE ниже проверяют их точно
+        match_terms = []
+        if search_query and can_use_trigrams(search_query):
+            match_terms.append(quote_phrase(search_query))
+        if skills_filter and can_use_trigrams(skills_filter):
+            match_terms.append('skills : ' + quote_phrase(skills_filter))
+        if match_terms:
+            query += " AND p.id IN (SELECT rowid FROM projects_trgm WHERE projects_trgm MATCH ?)"
+            params.append(' AND '.join(match_terms))
+        
+        if search_query:
+            query += " AND (p.title LIKE ? OR p.description LIKE ? OR p.skills LIKE ?)"
+            search_term = f"%{search_query}%"
+            params.extend([search_term, search_term, search_term])
+        
+        if category_filter != "all":
+            query += " AND p.category = ?"
+            params.append(category_filter)
+        
+        if skills_filter:
+            query += " AND p.skills LIKE ?"
+            params.append(f"%{skills_filter}%")
+        
+        query += " ORDER BY p.created_at DESC"
+        
+        cursor.execute(query, tuple(params))
+        return cursor.fetchall()
+    
+    def get_all_categories(self):
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT DISTINCT category FROM projects WHERE category IS NOT NULL ORDER BY category')
+        categories = [row[0] for row in cursor.fetchall()]
+        return ['Все категории'] + categories
+    
+    def create_project(self, title, description, skills, author_id):
+        category = self.detect_category(title, description, skills)
+        
+        # Проект и автор-участник создаются в одной записи
+        def write(cursor):
+            cursor.execute('''
+                INSERT INTO projects (title, description, skills, author_id, category)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (title, description, skills, author_id, category))
+            project_id = cursor.lastrowid
+            self._insert_member(cursor, project_id, author_id, 'creator')
+            return project_id
+        
+        return self.writer.call(write)
+    
+    def create_projects_bulk(self, projects):
+        """Создать проекты одной записью: [(title, description, skills, author_id), ...].
+        
+        Категория и автор-участник — как в create_project. Возвращает список id.
+        """
+        rows = [(title, description, skills, author_id, self.detect_category(title, description, skills))
+                for title, description, skills, author_id in projects]
+        
+        def write(cursor):
+            project_ids = []
+            for row in rows:
+                cursor.execute('''
+                    INSERT INTO projects (title, description, skills, author_id, category)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', row)
+                project_ids.append(cursor.lastrowid)
+            cursor.executemany('''
+                INSERT INTO project_members (project_id, user_id, role)
+                VALUES (?, ?, 'creator')
+            ''', [(project_id, row[3]) for project_id, row in zip(project_ids, rows)])
+            return project_ids
+        
+        return self.writer.call(write)
+    
+    def detect_category(self, title, description, skills):
+        text = f"{title} {description} {skills}".lower()
+        categories = {
+            'Веб-разработка': ['веб', 'web', 'сайт', 'frontend', 'backend', 'fullstack', 'html', 'css', 'javascript'],
+            'Мобильная разработка': ['мобильн', 'android', 'ios', 'flutter', 'react native', 'приложени'],
+            'Дизайн': ['дизайн', 'ui', 'ux', 'figma', 'photoshop', 'графическ', 'интерфейс'],
+            'Анализ данных': ['анализ', 'data', 'данн', 'python', 'pandas', 'numpy', 'статистик'],
+            'Программирование': ['программир', 'код', 'алгоритм', 'разработк', 'java', 'c++', 'python'],
+            'Игры': ['игр', 'unity', 'unreal', 'гейм', 'game'],
+            'ИИ и ML': ['ии', 'ai', 'машин', 'нейрон', 'ml', 'tensorflow'],
+        }
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                if keyword in text:
+                    return category
+        return 'Другое'
+    
+    def apply_to_project(self, project_id, user_id, message=""):
+        def write(cursor):
+            # Проверяем, не подана ли уже заявка
+            cursor.execute('SELECT id FROM applications WHERE project_id = ? AND user_id = ?', 
+                           (project_id, user_id))
+            if cursor.fetchone():
+                return False
+                
+            cursor.execute('''
+                INSERT INTO applications (project_id, user_id, message)
+                VALUES (?, ?, ?)
+            ''', (project_id, user_id, message))
+            return True
+        
+        try:
+            return self.writer.call(write)
+        except Exception as e:
+            print(f"Error applying to project: {e}")
+            return False
+    
+    def get_project_members(self, project_id):
+        cursor = self.get_connection().cursor()
+        cursor.execute('''
+            SELECT u.id, u.username, u.avatar, u.direction, pm.role, pm.joined_at
+            FROM project_members pm
+            JOIN users u ON pm.user_id = u.id
+            WHERE pm.project_id = ?
+            ORDER BY pm.joined_at
+        ''', (project_id,))
+        return cursor.fetchall()
+    
+    def add_project_member(self, project_id, user_id, role='member'):
+        try:
+            self.writer.call(self._insert_member, project_id, user_id, role)
+            return True
+        except:
+            return False
+    
+    def _insert_member(self, cursor, project_id, user_id, role):
+        cursor.execute('''
+            INSERT INTO project_members (project_id, user_id, role)
+            VALUES (?, ?, ?)
+        ''', (project_id, user_id, role))
+    
+    def get_project_messages(self, project_id, before_id=None, limit=MESSAGES_PAGE_SIZE):
+        """Страница истории чата, новые первыми; before_id — id самого старого уже загруженного сообщения"""
+        cursor = self.get_connection().cursor()
+        query = '''
+            SELECT m.*, u.username, u.avatar
+            FROM messages m
+            JOIN users u ON m.user_id = u.id
+            WHERE m.project_id = ?
+        '''
+        params = [project_id]
+        if before_id is not None:
+            query += " AND m.id < ?"
+            params.append(before_id)
+        query += " ORDER BY m.id DESC LIMIT ?"
+        params.append(limit)
+        cursor.execute(query, tuple(params))
+        return cursor.fetchall()
+    
+    def get_messages_since(self, project_id, after_id, limit=None):
+        """Сообщения проекта с id больше after_id, по порядку"""
+        cursor = self.get_connection().cursor()
+        query = '''
+            SELECT m.*, u.username, u.avatar
+            FROM messages m
+            JOIN users u ON m.user_id = u.id
+            WHERE m.project_id = ? AND m.id > ?
+            ORDER BY m.id
+        '''
+        params = [project_id, after_id]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        cursor.execute(query, tuple(params))
+        return cursor.fetchall()
+    
+    def add_message(self, project_id, user_id, message):
+        try:
+            self.writer.call(lambda cursor: cursor.execute('''
+                INSERT INTO messages (project_id, user_id, message)
+                VALUES (?, ?, ?)
+            ''', (project_id, user_id, message)))
+            return True
+        except:
+            return False
+    
+    def add_messages_bulk(self, messages):
+        """Добавить сообщения одной записью: [(project_id, user_id, message), ...]"""
+        self.writer.call(lambda cursor: cursor.executemany('''
+            INSERT INTO messages (project_id, user_id, message)
+            VALUES (?, ?, ?)
+        ''', messages))
+    
+    def get_user_projects(self, user_id):
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT * FROM projects WHERE author_id = ? ORDER BY created_at DESC', (user_id,))
+        return cursor.fetchall()
+    
+    def _iter_table(self, table, parse_skills, chunk_size):
+        """Потоково читать таблицу в порядке id на отдельном соединении одним снимком"""
+        conn = self.pool.connect()
+        skills_index = None
+        if parse_skills:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+            skills_index = columns.index('skills')
+        for row in stream_rows(conn, f"SELECT * FROM {table} ORDER BY id", chunk_size=chunk_size):
+            if skills_index is not None:
+                row = row[:skills_index] + (set(split_list(row[skills_index])),) + row[skills_index + 1:]
+            yield row
+
+    def iter_users(self, chunk_size=CHUNK_SIZE, parse_skills=False):
+        """Генератор всех пользователей; parse_skills — skills как множество"""
+        return self._iter_table('users', parse_skills, chunk_size)
+
+    def iter_projects(self, chunk_size=CHUNK_SIZE, parse_skills=False):
+        """Генератор всех проектов; parse_skills — skills как множество"""
+        return self._iter_table('projects', parse_skills, chunk_size)
+
+    def get_user_applications(self, user_id):
+        cursor = self.get_connection().cursor()
+        cursor.execute('''
+            SELECT 
+                a.id,
+                a.project_id,
+                a.user_id,
+                a.message,
+                a.status,
+                a.created_at,
+                p.title,
+                p.status as project_status,
+                u.username as author_name
+            FROM applications a
+            JOIN projects p ON a.project_id = p.id
+            JOIN users u ON p.author_id = u.id
+            WHERE a.user_id = ?
+            ORDER BY a.created_at DESC
+        ''', (user_id,))
+        return cursor.fetchall()
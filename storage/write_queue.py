@@ -0,0 +1,108 @@
+# storage/write_queue.py
+"""Единственный поток записи SQLite с групповой фиксацией.
+
+Записи из любых потоков ставятся в очередь и выполняются по порядку одним
+потоком на своем соединении. Все записи, накопившиеся к началу транзакции,
+фиксируются одним COMMIT; каждая выполняется в своей точке сохранения,
+поэтому ошибка одной записи откатывает только ее. Читатели работают на
+своих соединениях в режиме WAL и не ждут писателя.
+"""
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+# Наибольшее число записей в одной транзакции
+MAX_BATCH = 64
+
+
+class WriteQueue:
+    """Очередь записей: submit(func, *args) -> Future, func(cursor, *args) выполняется в потоке записи"""
+
+    def __init__(self, connect, max_batch=MAX_BATCH):
+        """
+        connect: функция, открывающая соединение для потока записи
+        max_batch: наибольшее число записей в одной транзакции
+        """
+        self.connect = connect
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, func, *args):
+        """Поставить запись в очередь; результат func — в Future после COMMIT"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("очередь записи закрыта")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+                self._thread.start()
+            self._queue.put((future, func, args))
+        return future
+
+    def call(self, func, *args):
+        """Выполнить запись и дождаться фиксации; исключение func пробрасывается"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("вложенная запись из потока записи приведет к взаимной блокировке")
+        return self.submit(func, *args).result()
+
+    def close(self):
+        """Дописать очередь и остановить поток записи"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self):
+        conn = self.connect()
+        # Транзакциями управляем явно
+        conn.isolation_level = None
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                # None ставит close() последним, после всех записей
+                stop = batch[-1] is None
+                batch = [item for item in batch if item is not None and item[0].set_running_or_notify_cancel()]
+                if batch:
+                    self._commit_batch(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, func, args in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    result = func(conn.cursor(), *args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    results.append((future, None, e))
+                else:
+                    results.append((future, result, None))
+                conn.execute("RELEASE write")
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            # Транзакция не зафиксирована — не выполнена ни одна запись пакета
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            results = [(future, None, e) for future, _, _ in batch]
+
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
@@ -0,0 +1,90 @@
+# tests/test_matching.py
+"""Совпадения из match_scores против расчета на лету после каждого вида записи"""
+import os
+import random
+import tempfile
+import unittest
+
+from benchmarks.datagen import DataGenerator
+from storage import Database
+from storage.matching import TOP_MATCHES
+
+# Маленький словарь — много общих терминов и равных баллов
+VOCABULARY = 40
+
+
+def summary(matches):
+    return [(m['user']['id'], m['score'], sorted(m['common_skills']), sorted(m['common_interests']))
+            for m in matches]
+
+
+class StoredMatchesTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.workdir.name, 'collabmatch.db'))
+        self.generator = DataGenerator(7, vocabulary_size=VOCABULARY)
+        self.rng = random.Random(7)
+        self.db.add_users_bulk(list(self.generator.users(300)))
+
+    def tearDown(self):
+        self.db.close()
+        self.workdir.cleanup()
+
+    def assertStoredMatchLive(self):
+        cursor = self.db.get_connection().cursor()
+        cursor.execute("SELECT id FROM users")
+        for (user_id,) in cursor.fetchall():
+            with self.subTest(user_id=user_id):
+                stored = self.db.find_matches(user_id, limit=TOP_MATCHES)
+                live = self.db.matcher.find_matches(user_id, limit=TOP_MATCHES)
+                self.assertEqual(summary(stored), summary(live))
+
+    def random_user(self):
+        cursor = self.db.get_connection().cursor()
+        cursor.execute("SELECT MAX(id) FROM users")
+        return self.rng.randint(1, cursor.fetchone()[0])
+
+    def test_bulk_insert(self):
+        self.db.add_users_bulk(list(self.generator.users(100)))
+        self.assertStoredMatchLive()
+
+    def test_add_user(self):
+        for user in self.generator.users(20):
+            self.db.add_user(*user)
+        self.assertStoredMatchLive()
+
+    def test_update_user(self):
+        for _ in range(20):
+            self.db.update_user(self.random_user(),
+                                skills=self.generator.terms(self.generator.skills),
+                                interests=self.generator.terms(self.generator.interests),
+                                looking_for_project=self.rng.random() < 0.5)
+        self.assertStoredMatchLive()
+
+    def test_update_user_drops_terms(self):
+        # Балл пользователя падает ниже прежнего top_k-го места в чужих списках
+        for _ in range(30):
+            user_id = self.random_user()
+            skills = self.db.get_user_skills(user_id)[:-1]
+            interests = self.db.get_user_interests(user_id)[:-1]
+            self.db.update_user(user_id, skills=skills, interests=interests, looking_for_project=False)
+        self.assertStoredMatchLive()
+
+    def test_rebuild_after_deferred_insert(self):
+        user_ids = self.db.add_users_bulk(list(self.generator.users(50)), refresh_scores=False)
+        self.db.rebuild_match_scores(user_ids)
+        self.assertStoredMatchLive()
+        self.db.rebuild_match_scores()
+        self.assertStoredMatchLive()
+
+    def test_pages_past_stored_matches(self):
+        # За пределами top_k совпадения считаются на лету, стыкуясь с сохраненными
+        user_id = self.random_user()
+        total = self.db.count_matches(user_id)
+        first = self.db.find_matches(user_id, limit=TOP_MATCHES)
+        rest = self.db.find_matches(user_id, limit=total, offset=TOP_MATCHES)
+        self.assertEqual(summary(first + rest), summary(self.db.matcher.find_matches(user_id)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# tests/test_search.py
+"""search_substring против полного просмотра с LIKE '%query%'"""
+import os
+import tempfile
+import unittest
+
+from benchmarks.datagen import DataGenerator
+from storage import Database
+from storage.collabmatch import SEARCH_ORDER
+from storage.search_index import TRIGRAM_INDEXES
+
+# Короткие (без триграмм), кириллица, регистр, символы LIKE и кавычки
+QUERIES = ['Python', 'python', 'PYTH', 'R', 'Go', 'SQL', 'skill-1', 'нейро', 'Иван', 'Мероприятие 1',
+           'Аудитория', 'planning', 'example.com', '%', '50%', '_', 'a"b', "'", 'нет-такого-текста']
+
+
+class SubstringSearchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.TemporaryDirectory()
+        cls.db = Database(os.path.join(cls.workdir.name, 'collabmatch.db'))
+        generator = DataGenerator(11, vocabulary_size=200)
+        cls.db.add_users_bulk(list(generator.users(300)))
+        cls.db.add_events_bulk(list(generator.events(100)))
+        cls.db.add_projects_bulk(list(generator.projects(100, 300)))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        cls.workdir.cleanup()
+
+    def like_baseline(self, table, columns, query):
+        """Полный просмотр таблицы без триграммного индекса"""
+        condition = ' OR '.join(f'{column} LIKE ?' for column in columns)
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(f"SELECT * FROM {table} NOT INDEXED WHERE {condition} ORDER BY {SEARCH_ORDER[table]}",
+                       [f"%{query}%"] * len(columns))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def test_same_rows_and_order(self):
+        for query in QUERIES:
+            results = self.db.search_substring(query)
+            for table, columns in TRIGRAM_INDEXES.values():
+                with self.subTest(query=query, table=table):
+                    expected = self.like_baseline(table, columns, query)
+                    found = results[table]
+                    # Строки с равным ключом сортировки могут идти в любом порядке
+                    key = SEARCH_ORDER[table].split()[0]
+                    self.assertEqual([row[key] for row in found], [row[key] for row in expected])
+                    self.assertEqual(sorted(row['id'] for row in found), sorted(row['id'] for row in expected))
+
+    def test_pages_cover_all_rows(self):
+        full = self.db.search_substring('Python')['users']
+        self.assertTrue(full)
+        pages = []
+        for offset in range(0, len(full), 7):
+            pages.extend(self.db.search_substring('Python', limit=7, offset=offset)['users'])
+        self.assertEqual([row['id'] for row in pages], [row['id'] for row in full])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# tests/test_write_queue.py
+"""WriteQueue: ошибка одной записи в пакете откатывает только ее"""
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from storage.write_queue import WriteQueue
+
+
+class WriteQueueRollbackTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, 'queue.db')
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+        conn.commit()
+        conn.close()
+        self.queue = WriteQueue(lambda: sqlite3.connect(self.path, check_same_thread=False))
+
+    def tearDown(self):
+        self.queue.close()
+        self.workdir.cleanup()
+
+    def names(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return [row[0] for row in conn.execute("SELECT name FROM items ORDER BY id")]
+        finally:
+            conn.close()
+
+    def insert(self, cursor, name):
+        cursor.execute("INSERT INTO items (name) VALUES (?)", (name,))
+        return cursor.lastrowid
+
+    def test_failing_write_in_batch(self):
+        # Поток записи ждет, пока в очереди не наберутся все записи, — они идут одним пакетом
+        release = threading.Event()
+        blocker = self.queue.submit(lambda cursor: release.wait(5))
+
+        def partial_then_fail(cursor):
+            # Первая вставка этой записи тоже должна откатиться
+            self.insert(cursor, 'partial')
+            self.insert(cursor, 'first')
+
+        futures = [self.queue.submit(self.insert, 'first'),
+                   self.queue.submit(partial_then_fail),
+                   self.queue.submit(self.insert, 'second')]
+        release.set()
+        blocker.result()
+
+        self.assertEqual(futures[0].result(), 1)
+        with self.assertRaises(sqlite3.IntegrityError):
+            futures[1].result()
+        self.assertIsNotNone(futures[2].result())
+        self.assertEqual(self.names(), ['first', 'second'])
+
+    def test_queue_continues_after_error(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.queue.call(lambda cursor: 1 / 0)
+        self.queue.call(self.insert, 'after')
+        self.assertEqual(self.names(), ['after'])
+
+
+if __name__ == '__main__':
+    unittest.main()